@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mesure de l'encodage des QR codes avec la sélection du masque bit à bit
+(qr_mask.FastMaskQRCode) et avec celle de référence (qrcode.QRCode).
+
+Les vCards sont construites à partir des lignes synthétiques de
+bench_pipeline ; les deux encodeurs reçoivent les mêmes données et doivent
+produire les mêmes matrices.
+
+    python benchmarks/bench_mask.py
+    python benchmarks/bench_mask.py --rows 500 --repeat 5
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+
+
+def encode_all(qr_class, vcards, error_correction):
+    """
+    Encode toutes les vCards (version ajustée, comme encode_modules) et renvoie les matrices
+    """
+    matrices = []
+    for vcard in vcards:
+        qr = qr_class(version=1, error_correction=error_correction, border=0)
+        qr.add_data(vcard)
+        qr.make(fit=True)
+        matrices.append(qr.modules)
+    return matrices
+
+
+def best_time(qr_class, vcards, error_correction, repeat):
+    """
+    Meilleur temps (s) sur `repeat` passages
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        encode_all(qr_class, vcards, error_correction)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Encodage QR : masque bit à bit contre qrcode")
+    parser.add_argument("--rows", type=int, default=200, help="nombre de vCards encodées")
+    parser.add_argument("--repeat", type=int, default=5, help="passages (meilleur temps retenu)")
+    args = parser.parse_args()
+
+    sys.path[:0] = [str(SRC_DIR), str(BENCH_DIR)]
+    import qrcode
+    import bench_pipeline
+    from qr_mask import FastMaskQRCode
+    from qr_generator import create_vcard, QR_ERROR_CORRECTION
+
+    headers = bench_pipeline.DEFAULT_HEADERS
+    vcards = [
+        create_vcard(*bench_pipeline.vcard_args(dict(zip(headers, bench_pipeline.synthetic_row(i, headers)))))
+        for i in range(args.rows)
+    ]
+
+    if encode_all(FastMaskQRCode, vcards, QR_ERROR_CORRECTION) != encode_all(qrcode.QRCode, vcards, QR_ERROR_CORRECTION):
+        print("Matrices différentes de la référence", file=sys.stderr)
+        return 1
+
+    print(f"=== Encodage de {args.rows} vCards (meilleur de {args.repeat}) ===\n")
+    reference = best_time(qrcode.QRCode, vcards, QR_ERROR_CORRECTION, args.repeat)
+    fast = best_time(FastMaskQRCode, vcards, QR_ERROR_CORRECTION, args.repeat)
+    print(f"  qrcode.QRCode      {reference / args.rows * 1000:8.3f} ms/vCard")
+    print(f"  FastMaskQRCode     {fast / args.rows * 1000:8.3f} ms/vCard")
+    print(f"  Accélération       {reference / fast:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Banc d'essai de la chaîne de génération des QR codes.
+
+Mesure create_vcard, generate_qr_svg, le rendu de l'aperçu et le traitement
+complet process_excel_file sur des classeurs synthétiques (1k, 10k et 100k
+lignes par défaut) construits sur le modèle de data/contacts.xlsx.
+
+Chaque mesure est exécutée dans un processus séparé pour obtenir un pic de
+mémoire (RSS) propre à la mesure. Les résultats sont écrits en JSON (lignes/s,
+latence par ligne p50/p99, pic RSS) et peuvent être comparés à une référence :
+
+    python benchmarks/bench_pipeline.py --output resultats.json
+    python benchmarks/bench_pipeline.py --sizes 1000 --baseline reference.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import contextlib
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = ROOT_DIR / "src"
+TEMPLATE_PATH = ROOT_DIR / "data" / "contacts.xlsx"
+
+# Dossier des classeurs synthétiques (réutilisés d'une exécution à l'autre)
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+
+BENCHMARKS = ("create_vcard", "generate_qr_svg", "preview", "process_excel_file")
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Colonnes utilisées si le modèle data/contacts.xlsx est introuvable
+DEFAULT_HEADERS = ['prenom', 'nom', 'profession', 'societe', 'mobile', 'pro', 'email', 'adresse', 'site_web']
+
+PRENOMS = ["Jean", "Marie", "Pierre", "Élodie", "François", "Chloé", "Loïc", "Hélène", "Amélie", "Noël"]
+NOMS = ["DUPONT", "MARTIN", "BERNARD", "LEFÈVRE", "GARÇON", "MOREAU", "ROUSSEAU", "FAURE", "GIRARD", "MERCIER"]
+PROFESSIONS = ["Développeur", "Chef de projet", "Commercial", "Responsable RH", "Ingénieur qualité", ""]
+
+
+def percentile(values, fraction):
+    """
+    Percentile (plus proche rang) d'une liste de valeurs
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """
+    Pic de mémoire résidente du processus courant, en Mo (None si indisponible)
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Octets sur macOS, kilo-octets ailleurs
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def read_template_headers():
+    """
+    En-têtes du fichier modèle data/contacts.xlsx
+    """
+    try:
+        import openpyxl
+        workbook = openpyxl.load_workbook(TEMPLATE_PATH, read_only=True)
+        headers = [str(v).lower() for v in next(workbook.active.iter_rows(values_only=True)) if v]
+        workbook.close()
+        return headers or DEFAULT_HEADERS
+    except Exception:
+        return DEFAULT_HEADERS
+
+
+def synthetic_row(index, headers):
+    """
+    Ligne de contact synthétique déterministe
+    """
+    prenom = PRENOMS[index % len(PRENOMS)]
+    nom = NOMS[(index // len(PRENOMS)) % len(NOMS)]
+    values = {
+        'prenom': prenom,
+        'nom': f"{nom}{index}",
+        'profession': PROFESSIONS[index % len(PROFESSIONS)],
+        'societe': "SUDALYS SERVICES",
+        'mobile': f"06.{index % 100:02d}.{(index // 100) % 100:02d}.00.00",
+        'pro': "01.23.45.67.89" if index % 3 else "",
+        'email': f"{prenom.lower()}.{nom.lower()}{index}@sudalys.fr",
+        'adresse': f"{index % 200 + 1} rue de Paris 75001 PARIS",
+        'site_web': "https://www.sudalys.fr" if index % 2 else "",
+    }
+    return [values.get(header, '') for header in headers]
+
+
+def ensure_workbook(rows):
+    """
+    Crée (une seule fois) le classeur synthétique de `rows` lignes et renvoie son chemin
+    """
+    path = DATA_DIR / f"contacts_{rows}.xlsx"
+    if path.exists():
+        return path
+
+    import openpyxl
+    DATA_DIR.mkdir(exist_ok=True, parents=True)
+    headers = read_template_headers()
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Contacts")
+    sheet.append(headers)
+    for index in range(rows):
+        sheet.append(synthetic_row(index, headers))
+    tmp_path = path.with_suffix('.tmp')
+    workbook.save(tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_rows(workbook_path):
+    """
+    Lit les lignes du classeur synthétique (dictionnaires champ -> texte)
+    """
+    from qr_sources import open_contact_source
+    with open_contact_source(workbook_path) as source:
+        return list(source)
+
+
+def vcard_args(row):
+    return (row['prenom'], row['nom'], row['profession'], row['societe'], row['mobile'],
+            row['pro'], row['email'], row['adresse'], row['site_web'])
+
+
+def run_one(name, workbook_path, workers):
+    """
+    Exécute une mesure dans le processus courant et renvoie son résultat
+    """
+    sys.path.insert(0, str(SRC_DIR))
+    import qr_generator
+
+    perf_counter = time.perf_counter
+
+    if name == "process_excel_file":
+        # Traitement complet, sans cache ni mode incrémental, sorties console masquées.
+        # Le chronométrage par étape donne le nombre de lignes traitées et leur latence,
+        # sans relire le classeur (ce qui fausserait le pic de mémoire)
+        from qr_timing import StageTimer
+        timer = StageTimer()
+        start = perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            qr_generator.process_excel_file(str(workbook_path), workers=workers, timer=timer)
+        elapsed = perf_counter() - start
+        peak = peak_rss_mb()
+        summary = timer.summary(slowest=0)
+        rows = summary['rows']
+        p50 = summary['row_total']['p50_ms'] / 1000
+        p99 = summary['row_total']['p99_ms'] / 1000
+    else:
+        contacts = load_rows(workbook_path)
+        if name == "create_vcard":
+            def step(index, row):
+                qr_generator.create_vcard(*vcard_args(row))
+        elif name == "generate_qr_svg":
+            def step(index, row):
+                qr_generator.generate_qr_svg(qr_generator.create_vcard(*vcard_args(row)), f"bench_{index}")
+        else:
+            from qr_app import render_preview_image
+
+            def step(index, row):
+                render_preview_image(qr_generator.create_vcard(*vcard_args(row)))
+
+        latencies = []
+        start = perf_counter()
+        for index, row in enumerate(contacts):
+            row_start = perf_counter()
+            step(index, row)
+            latencies.append(perf_counter() - row_start)
+        elapsed = perf_counter() - start
+        peak = peak_rss_mb()
+        rows = len(contacts)
+        p50 = percentile(latencies, 0.50)
+        p99 = percentile(latencies, 0.99)
+
+    return {
+        'benchmark': name,
+        'rows': rows,
+        'workers': workers if name == "process_excel_file" else 1,
+        'seconds': round(elapsed, 4),
+        'rows_per_s': round(rows / elapsed, 2) if elapsed > 0 else None,
+        'p50_ms': round(p50 * 1000, 4) if p50 is not None else None,
+        'p99_ms': round(p99 * 1000, 4) if p99 is not None else None,
+        'peak_rss_mb': round(peak, 1) if peak is not None else None,
+    }
+
+
+def run_isolated(name, rows, workers, work_dir):
+    """
+    Exécute une mesure dans un processus séparé (dossier de travail dédié)
+    """
+    workbook_path = ensure_workbook(rows)
+    cmd = [sys.executable, os.path.abspath(__file__), "--run-one", name,
+           "--workbook", str(workbook_path), "--workers", str(workers)]
+    result = subprocess.run(cmd, cwd=work_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        raise RuntimeError(f"Échec de la mesure {name} ({rows} lignes)")
+    measure = json.loads(result.stdout.strip().splitlines()[-1])
+    measure['size'] = rows
+    return measure
+
+
+def compare_with_baseline(results, baseline_path, tolerance):
+    """
+    Compare les débits à une référence ; renvoie le nombre de régressions
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    reference = {(r['benchmark'], r['size']): r for r in baseline.get('results', [])}
+
+    regressions = 0
+    print(f"\nComparaison avec {baseline_path} (tolérance {tolerance:.0%}) :")
+    for result in results:
+        ref = reference.get((result['benchmark'], result['size']))
+        if ref is None or not ref.get('rows_per_s') or not result.get('rows_per_s'):
+            print(f"  {result['benchmark']:<20} {result['size']:>7} : pas de référence")
+            continue
+        ratio = result['rows_per_s'] / ref['rows_per_s']
+        status = "OK"
+        if ratio < 1 - tolerance:
+            status = "RÉGRESSION"
+            regressions += 1
+        elif ratio > 1 + tolerance:
+            status = "amélioration"
+        print(f"  {result['benchmark']:<20} {result['size']:>7} : {ref['rows_per_s']:>10.1f} -> "
+              f"{result['rows_per_s']:>10.1f} lignes/s ({ratio - 1:+.1%}) {status}")
+    return regressions
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Banc d'essai de la génération des QR codes")
+    parser.add_argument("--benchmarks", default=",".join(BENCHMARKS),
+                        help="mesures à exécuter, séparées par des virgules")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="tailles des classeurs synthétiques (nombre de lignes)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processus utilisés par process_excel_file")
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    parser.add_argument("--baseline", help="fichier JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="baisse de débit tolérée avant de signaler une régression")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    parser.add_argument("--workbook", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Processus enfant : une seule mesure, résultat JSON sur la sortie standard
+    if args.run_one:
+        print(json.dumps(run_one(args.run_one, args.workbook, args.workers)))
+        return 0
+
+    names = [name.strip() for name in args.benchmarks.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"mesures inconnues: {unknown} (disponibles: {', '.join(BENCHMARKS)})")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    print("=== Banc d'essai de la génération des QR codes ===\n")
+
+    import tempfile
+    results = []
+    for rows in sizes:
+        print(f"Préparation du classeur de {rows} lignes...")
+        ensure_workbook(rows)
+        for name in names:
+            with tempfile.TemporaryDirectory() as work_dir:
+                measure = run_isolated(name, rows, args.workers, work_dir)
+            results.append(measure)
+            print(f"  {name:<20} {measure['rows_per_s'] or 0:>10.1f} lignes/s  "
+                  f"p50 {measure['p50_ms'] if measure['p50_ms'] is not None else '-':>8} ms  "
+                  f"p99 {measure['p99_ms'] if measure['p99_ms'] is not None else '-':>8} ms  "
+                  f"RSS {measure['peak_rss_mb'] if measure['peak_rss_mb'] is not None else '-'} Mo")
+
+    report = {
+        'meta': {
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'workers': args.workers,
+        },
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nRésultats écrits dans {args.output}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\n{regressions} régression(s) détectée(s)")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
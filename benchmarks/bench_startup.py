@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mesure du temps de démarrage de l'interface (jusqu'au premier affichage).
+
+L'application est lancée plusieurs fois avec --startup-report : elle écrit
+le temps écoulé entre le chargement de qr_app et le premier affichage de la
+fenêtre, puis quitte. Le temps total du processus (lancement, décompression
+de l'exécutable, fermeture) est mesuré en plus de l'extérieur.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --exe dist/Sudalys_QR_Generator.exe --output demarrage.json
+
+Un affichage graphique est nécessaire.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = ROOT_DIR / "src"
+
+
+def run_once(cmd, cwd):
+    """
+    Lance l'application une fois et renvoie (temps total, temps jusqu'au premier affichage)
+    """
+    fd, report_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        started = time.perf_counter()
+        result = subprocess.run(cmd + ["--startup-report", report_path], cwd=cwd,
+                                capture_output=True, text=True, timeout=120)
+        wall = time.perf_counter() - started
+        if result.returncode != 0:
+            print(result.stderr, file=sys.stderr)
+            raise RuntimeError(f"Échec du lancement: {' '.join(cmd)}")
+        with open(report_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        return wall, report['first_paint_s']
+    finally:
+        os.remove(report_path)
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Temps de démarrage de l'interface")
+    parser.add_argument("--exe", help="exécutable compilé à mesurer (par défaut : src/qr_app.py)")
+    parser.add_argument("--runs", type=int, default=5, help="nombre de lancements")
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    args = parser.parse_args()
+
+    if args.exe:
+        cmd = [os.path.abspath(args.exe)]
+        cwd = os.path.dirname(cmd[0])
+        build = "frozen"
+    else:
+        cmd = [sys.executable, str(SRC_DIR / "qr_app.py")]
+        cwd = str(SRC_DIR)
+        build = "source"
+
+    print(f"=== Démarrage de l'interface ({build}, {args.runs} lancements) ===\n")
+
+    walls = []
+    first_paints = []
+    for run in range(args.runs):
+        wall, first_paint = run_once(cmd, cwd)
+        walls.append(wall)
+        first_paints.append(first_paint)
+        print(f"  lancement {run + 1}: premier affichage {first_paint * 1000:.0f} ms, "
+              f"processus {wall * 1000:.0f} ms")
+
+    result = {
+        'build': build,
+        'runs': args.runs,
+        'first_paint_ms': {
+            'median': round(statistics.median(first_paints) * 1000, 1),
+            'min': round(min(first_paints) * 1000, 1),
+        },
+        'process_ms': {
+            'median': round(statistics.median(walls) * 1000, 1),
+            'min': round(min(walls) * 1000, 1),
+        },
+    }
+    print(f"\nPremier affichage : médiane {result['first_paint_ms']['median']} ms, "
+          f"processus complet : médiane {result['process_ms']['median']} ms")
+
+    if args.output:
+        report = {
+            'meta': {
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+            },
+            'results': [result],
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Résultats écrits dans {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -66,8 +66,6 @@ def build_windows_executable():
         "--exclude-module", "pdb",
         "--exclude-module", "pydoc",
         "--exclude-module", "sqlite3",
-        "--exclude-module", "multiprocessing",
-        "--exclude-module", "concurrent",
         "--hidden-import", "openpyxl",
         "--hidden-import", "qrcode",
         "--hidden-import", "PIL"
@@ -1,25 +1,85 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import time
+
+# Début du démarrage, pour mesurer le temps jusqu'au premier affichage
+STARTUP_STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import qrcode
-import qrcode.image.svg
 import os
 import sys
-import base64
+import json
+import argparse
 import platform
 import subprocess
+import multiprocessing
+import threading
+import importlib
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from PIL import Image, ImageTk
-import io
-import openpyxl
-import openpyxl.styles
+
+# qrcode, PIL et openpyxl sont longs à importer : ils sont chargés au premier
+# usage ou en arrière-plan une fois la fenêtre affichée (voir warm_up_imports)
 
 # Importer les fonctions du générateur
-from qr_generator import create_vcard, generate_qr_svg, process_excel_file
+from qr_generator import (create_vcard, generate_qr_svg, process_records, make_filename,
+                          get_default_cache_dir, get_default_output_dir)
+from qr_cache import RenderCache, PreviewCache, DEFAULT_PREVIEW_ENTRIES
+from qr_generator import QR_VERSION, QR_ERROR_CORRECTION, OUTPUT_FORMATS, SHEET_FORMAT
+from qr_render import encode_modules, modules_to_image
+from qr_output import ArchiveWriter, DirectorySink
+from qr_pdf import PdfLabelWriter
+from qr_sources import open_contact_source, SOURCE_FILETYPES, REQUIRED_FIELDS, RECORD_NUMBER_FIELD
+from qr_table import VirtualTable
+
+# Taille (pixels) et marge (modules) de l'aperçu affiché
+PREVIEW_SIZE = 200
+PREVIEW_BORDER = 4
+
+# Intervalle (ms) de vérification d'un aperçu calculé en arrière-plan
+PREVIEW_POLL_MS = 15
+
+# Chargement des fichiers de contacts : lignes envoyées au tableau par paquet,
+# intervalle (ms) de lecture des paquets par le thread Tk
+LOAD_CHUNK_SIZE = 500
+LOAD_POLL_MS = 50
+
+# Lignes voisines (avant et après la sélection) dont l'aperçu est préparé à l'avance
+PREFETCH_ROWS = 3
+
+# Bibliothèques lourdes chargées en arrière-plan après l'affichage de la fenêtre
+WARM_UP_MODULES = ('qr_mask', 'PIL.Image', 'PIL.ImageTk', 'openpyxl')
+
+def warm_up_imports():
+    """
+    Importe les bibliothèques lourdes (encodeur QR, PIL, openpyxl) pour que
+    leur premier usage soit immédiat
+    """
+    for module_name in WARM_UP_MODULES:
+        importlib.import_module(module_name)
+
+
+def render_preview(data):
+    """
+    Encode un QR code et renvoie sa matrice de modules et son image d'aperçu
+    """
+    modules = encode_modules(data, QR_VERSION, QR_ERROR_CORRECTION)
+    return modules, modules_to_image(modules, PREVIEW_SIZE, PREVIEW_BORDER)
+
+
+def render_preview_image(data):
+    """
+    Génère l'image PIL 1 bit (200x200) de l'aperçu d'un QR code,
+    directement à partir de la matrice de modules
+    """
+    return render_preview(data)[1]
+
 
 class QRCodeGeneratorApp:
-    def __init__(self, root):
+    def __init__(self, root, preview_cache_size=DEFAULT_PREVIEW_ENTRIES):
         self.root = root
         self.root.title("Générateur de QR Code - Sudalys Services")
         self.root.geometry("800x700")
@@ -46,17 +106,9 @@ class QRCodeGeneratorApp:
         self.main_frame = ttk.Frame(root, padding="20")
         self.main_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Logo
-        try:
-            logo_path = "logo_sudalys_services.jpg"
-            logo_img = Image.open(logo_path)
-            logo_img = logo_img.resize((200, 100), Image.LANCZOS)
-            self.logo_photo = ImageTk.PhotoImage(logo_img)
-            
-            logo_label = ttk.Label(self.main_frame, image=self.logo_photo, background="#f0f0f0")
-            logo_label.grid(row=0, column=0, columnspan=2, pady=(0, 20))
-        except Exception as e:
-            print(f"Erreur lors du chargement du logo: {e}")
+        # Logo (l'image est chargée une fois la fenêtre affichée, voir load_logo)
+        self.logo_label = ttk.Label(self.main_frame, background="#f0f0f0")
+        self.logo_label.grid(row=0, column=0, columnspan=2, pady=(0, 20))
         
         # Titre
         title_label = ttk.Label(self.main_frame, text="Générateur de QR Code vCard", style="Header.TLabel")
@@ -101,16 +153,66 @@ class QRCodeGeneratorApp:
         # Données Excel
         self.excel_data = []
         self.excel_headers = {}
+        self.excel_source = None
         
-        # Variable pour optimiser la génération en temps réel
-        self.last_update_time = 0
-        self.update_delay = 500  # 500ms de délai pour éviter trop de générations
+        # Aperçu en temps réel : un seul minuteur relancé à chaque saisie,
+        # encodage dans un thread et numéro de génération pour ignorer les résultats périmés
+        self.update_delay = 250  # délai (ms) après la dernière frappe
+        self.preview_timer = None
+        self.preview_generation = 0
+        self.preview_executor = ThreadPoolExecutor(max_workers=1)
+        self.preview_job = None  # aperçu en cours de calcul
+        self.preview_wanted = None  # dernier aperçu demandé, en attente du thread
+        self.preview_prefetch = deque()  # vCards des lignes voisines à préparer
+        
+        # Aperçus déjà affichés (vCard -> matrice et image), pour revenir instantanément sur un contact
+        self.preview_cache = PreviewCache(preview_cache_size)
         
         # Variable pour la fenêtre d'aide
         self.help_window = None
         
+        # Cache disque des QR codes déjà rendus (partagé entre les générations)
+        self.render_cache = RenderCache(get_default_cache_dir())
+        
+        # Génération en lot en arrière-plan (file de messages lue par le thread Tk)
+        self.batch_thread = None
+        self.batch_queue = queue.Queue()
+        self.batch_cancel_event = threading.Event()
+        self.batch_started = 0
+        
         # Vider complètement la mémoire au démarrage
         self.clear_all_data()
+        
+        # Fin du démarrage une fois la fenêtre affichée
+        self.startup_report = None
+        self.root.after_idle(self.finish_startup)
+    
+    def finish_startup(self):
+        """Premier affichage terminé : mesure du démarrage puis chargements différés"""
+        self.root.update_idletasks()
+        first_paint = time.perf_counter() - STARTUP_STARTED
+        
+        # Mesure demandée (banc d'essai) : écrire le résultat et quitter
+        if self.startup_report:
+            with open(self.startup_report, 'w', encoding='utf-8') as f:
+                json.dump({'first_paint_s': round(first_paint, 4), 'frozen': getattr(sys, 'frozen', False)}, f)
+            self.root.destroy()
+            return
+        
+        self.load_logo()
+        self.preview_executor.submit(warm_up_imports)
+    
+    def load_logo(self):
+        try:
+            from PIL import Image, ImageTk
+            
+            logo_path = "logo_sudalys_services.jpg"
+            logo_img = Image.open(logo_path)
+            logo_img = logo_img.resize((200, 100), Image.LANCZOS)
+            self.logo_photo = ImageTk.PhotoImage(logo_img)
+            self.logo_label.configure(image=self.logo_photo)
+        except Exception as e:
+            print(f"Erreur lors du chargement du logo: {e}")
     
     def setup_manual_tab(self):
         # Créer un cadre pour les champs de saisie
@@ -173,7 +275,7 @@ class QRCodeGeneratorApp:
         file_frame = ttk.Frame(excel_frame)
         file_frame.pack(fill=tk.X, pady=10)
         
-        file_label = ttk.Label(file_frame, text="Fichier Excel:")
+        file_label = ttk.Label(file_frame, text="Fichier de contacts:")
         file_label.pack(side=tk.LEFT, padx=5)
         
         self.excel_path_var = tk.StringVar()
@@ -185,12 +287,20 @@ class QRCodeGeneratorApp:
         browse_btn = ttk.Button(file_frame, text="Parcourir", command=self.browse_excel)
         browse_btn.pack(side=tk.LEFT, padx=5)
         
+        # État du chargement du fichier (lu en arrière-plan)
+        self.load_status_var = tk.StringVar(value="")
+        load_status_label = ttk.Label(excel_frame, textvariable=self.load_status_var)
+        load_status_label.pack(fill=tk.X, padx=5)
+        self.load_generation = 0
+        self.load_cancel_event = None
+        self.load_total = None
+        
         # Boutons Excel
         excel_buttons_frame = ttk.Frame(excel_frame)
         excel_buttons_frame.pack(pady=10)
         
-        generate_all_btn = ttk.Button(excel_buttons_frame, text="Générer tous les QR Codes", command=self.generate_all_qr)
-        generate_all_btn.pack(side=tk.LEFT, padx=5)
+        self.generate_all_btn = ttk.Button(excel_buttons_frame, text="Générer tous les QR Codes", command=self.generate_all_qr)
+        self.generate_all_btn.pack(side=tk.LEFT, padx=5)
         
         clear_excel_btn = ttk.Button(excel_buttons_frame, text="Vider Excel", command=self.clear_excel_data)
         clear_excel_btn.pack(side=tk.LEFT, padx=5)
@@ -198,36 +308,62 @@ class QRCodeGeneratorApp:
         template_btn = ttk.Button(excel_buttons_frame, text="Télécharger Template", command=self.download_excel_template)
         template_btn.pack(side=tk.LEFT, padx=5)
         
-        # Tableau pour afficher les données Excel
-        self.excel_tree = ttk.Treeview(excel_frame, columns=("prenom", "nom", "profession", "societe", "email"), show="headings")
-        self.excel_tree.heading("prenom", text="Prénom")
-        self.excel_tree.heading("nom", text="Nom")
-        self.excel_tree.heading("profession", text="Profession")
-        self.excel_tree.heading("societe", text="Société")
-        self.excel_tree.heading("email", text="Email")
+        # Options de sortie : archive unique au lieu de fichiers séparés
+        output_options_frame = ttk.Frame(excel_frame)
+        output_options_frame.pack(pady=(0, 5))
+        
+        self.archive_output_var = tk.BooleanVar(value=False)
+        archive_check = ttk.Checkbutton(output_options_frame, text="Regrouper dans une archive (ZIP / tar)", variable=self.archive_output_var)
+        archive_check.pack(side=tk.LEFT, padx=5)
+        
+        self.archive_compress_var = tk.BooleanVar(value=True)
+        compress_check = ttk.Checkbutton(output_options_frame, text="Compresser", variable=self.archive_compress_var)
+        compress_check.pack(side=tk.LEFT, padx=5)
         
-        self.excel_tree.column("prenom", width=100)
-        self.excel_tree.column("nom", width=100)
-        self.excel_tree.column("profession", width=120)
-        self.excel_tree.column("societe", width=120)
-        self.excel_tree.column("email", width=150)
+        format_label = ttk.Label(output_options_frame, text="Format:")
+        format_label.pack(side=tk.LEFT, padx=(15, 5))
         
-        scrollbar = ttk.Scrollbar(excel_frame, orient=tk.VERTICAL, command=self.excel_tree.yview)
-        self.excel_tree.configure(yscrollcommand=scrollbar.set)
+        self.output_format_var = tk.StringVar(value="svg")
+        format_combo = ttk.Combobox(output_options_frame, textvariable=self.output_format_var,
+                                    values=OUTPUT_FORMATS + (SHEET_FORMAT,), state="readonly", width=6)
+        format_combo.pack(side=tk.LEFT, padx=5)
         
-        self.excel_tree.pack(fill=tk.BOTH, expand=True, pady=10)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Suivi de la génération en lot (progression, temps restant, annulation)
+        batch_frame = ttk.Frame(excel_frame)
+        batch_frame.pack(fill=tk.X, pady=(0, 5))
         
-        # Sélection d'un élément dans le tableau
-        self.excel_tree.bind("<<TreeviewSelect>>", self.on_excel_row_select)
+        self.batch_progress = ttk.Progressbar(batch_frame, orient=tk.HORIZONTAL, mode="determinate")
+        self.batch_progress.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
-        # Charger le fichier Excel par défaut s'il existe
-        self.load_excel_file()
+        self.batch_status_var = tk.StringVar(value="")
+        batch_status_label = ttk.Label(batch_frame, textvariable=self.batch_status_var, width=32)
+        batch_status_label.pack(side=tk.LEFT, padx=5)
+        
+        self.batch_cancel_btn = ttk.Button(batch_frame, text="Annuler", command=self.cancel_batch, state=tk.DISABLED)
+        self.batch_cancel_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Tableau pour afficher les données Excel (virtualisé : seules les lignes visibles sont créées)
+        self.excel_table = VirtualTable(
+            excel_frame,
+            columns=[
+                ("prenom", "Prénom", 100),
+                ("nom", "Nom", 100),
+                ("profession", "Profession", 120),
+                ("societe", "Société", 120),
+                ("email", "Email", 150),
+            ],
+            row_values=self.get_excel_row_values,
+            on_select=self.on_excel_row_select,
+        )
+        self.excel_table.pack(fill=tk.BOTH, expand=True, pady=10)
+        
+        # Pas de chargement du fichier par défaut au démarrage : clear_all_data
+        # vide les données à la fin de __init__ (il était lu puis aussitôt effacé)
     
     def browse_excel(self):
         file_path = filedialog.askopenfilename(
-            title="Sélectionner un fichier Excel",
-            filetypes=[("Fichiers Excel", "*.xlsx;*.xls")]
+            title="Sélectionner un fichier de contacts",
+            filetypes=SOURCE_FILETYPES
         )
         if file_path:
             self.excel_path_var.set(file_path)
@@ -238,79 +374,131 @@ class QRCodeGeneratorApp:
             file_path = self.excel_path_var.get()
             if not os.path.exists(file_path):
                 return
-                
-            # Lire le fichier Excel avec openpyxl
-            workbook = openpyxl.load_workbook(file_path, data_only=True)
-            sheet = workbook.active
             
-            # Trouver les en-têtes de colonnes
-            self.excel_headers = {}
-            header_row = next(sheet.iter_rows(min_row=1, max_row=1))
-            for col_idx, cell in enumerate(header_row):
-                if cell.value:
-                    self.excel_headers[cell.value.lower()] = col_idx
+            # Un seul chargement à la fois : le précédent est abandonné
+            self.cancel_excel_load()
+            generation = self.load_generation
+            cancel_event = threading.Event()
+            self.load_cancel_event = cancel_event
+            load_queue = queue.Queue()
             
-            # Lire toutes les données (seulement les lignes non vides)
             self.excel_data = []
-            for row in sheet.iter_rows(min_row=2):
-                row_data = {}
-                has_data = False
-                
-                for header, col_idx in self.excel_headers.items():
-                    cell = row[col_idx]
-                    value = str(cell.value).strip() if cell.value is not None else ''
-                    row_data[header] = value
-                    if value:  # Si au moins une cellule a des données
-                        has_data = True
-                
-                # N'ajouter que les lignes qui ont au moins une donnée
-                if has_data:
-                    self.excel_data.append(row_data)
-            
-            # Effacer les données existantes dans le tableau
-            for item in self.excel_tree.get_children():
-                self.excel_tree.delete(item)
-            
-            # Remplir le tableau avec les données
-            for index, row_data in enumerate(self.excel_data):
-                values = (
-                    row_data.get('prenom', ''),
-                    row_data.get('nom', ''),
-                    row_data.get('profession', ''),
-                    row_data.get('societe', ''),
-                    row_data.get('email', '')
-                )
-                self.excel_tree.insert('', tk.END, values=values, iid=str(index))
+            self.excel_headers = {}
+            # Fichier d'origine des lignes (manifeste du mode incrémental)
+            self.excel_source = os.path.abspath(file_path)
+            self.load_total = None
+            self.excel_table.clear()
+            self.load_status_var.set("Chargement...")
+            
+            # Lire le fichier dans un thread ; les lignes arrivent dans le tableau par paquets
+            threading.Thread(
+                target=self.read_contacts,
+                args=(file_path, load_queue, cancel_event),
+                daemon=True,
+            ).start()
+            self.root.after(LOAD_POLL_MS, self.poll_excel_load, load_queue, generation)
             
         except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors du chargement du fichier Excel: {e}")
-    
-    def on_excel_row_select(self, event):
-        selected_items = self.excel_tree.selection()
-        if selected_items:
-            try:
-                index = int(selected_items[0])
-                # Vérifier que l'index est valide
-                if 0 <= index < len(self.excel_data):
-                    row_data = self.excel_data[index]
-                    
-                    # Vérifier que la ligne a des données valides
-                    prenom = row_data.get('prenom', '').strip()
-                    nom = row_data.get('nom', '').strip()
-                    
-                    if prenom or nom:  # Au moins un des deux champs requis
-                        # Générer le QR code pour cette ligne
-                        self.generate_qr_from_row(row_data, index)
-                    else:
-                        # Désélectionner silencieusement la ligne vide
-                        self.excel_tree.selection_remove(selected_items[0])
+            messagebox.showerror("Erreur", f"Erreur lors du chargement du fichier: {e}")
+    
+    def read_contacts(self, file_path, load_queue, cancel_event):
+        """Lit le fichier de contacts (exécuté dans un thread, sans toucher à Tk)"""
+        try:
+            # Lire le fichier en flux (Excel, CSV, TSV ou JSON Lines selon l'extension)
+            with open_contact_source(file_path) as source:
+                load_queue.put(("headers", dict(source.headers), source.row_count))
+                
+                # Lire toutes les données (seulement les lignes non vides). Chaque fiche garde
+                # sa position dans le fichier : les QR codes sont numérotés comme en ligne de
+                # commande, lignes vides comprises
+                chunk = []
+                for number, row_data in enumerate(source, start=1):
+                    if cancel_event.is_set():
+                        return
+                    if any(row_data.values()):
+                        row_data[RECORD_NUMBER_FIELD] = number
+                        chunk.append(row_data)
+                        if len(chunk) >= LOAD_CHUNK_SIZE:
+                            load_queue.put(("rows", chunk))
+                            chunk = []
+                load_queue.put(("rows", chunk))
+            load_queue.put(("done",))
+        except Exception as e:
+            load_queue.put(("error", str(e)))
+    
+    def poll_excel_load(self, load_queue, generation):
+        """Ajoute au tableau les lignes lues depuis le dernier passage"""
+        if generation != self.load_generation:
+            # Chargement annulé ou remplacé par un autre
+            return
+        
+        finished = False
+        try:
+            while True:
+                message = load_queue.get_nowait()
+                if message[0] == "headers":
+                    self.excel_headers = message[1]
+                    self.load_total = message[2]
+                elif message[0] == "rows":
+                    self.excel_data.extend(message[1])
+                elif message[0] == "error":
+                    self.load_cancel_event = None
+                    self.load_status_var.set("Erreur de chargement")
+                    messagebox.showerror("Erreur", f"Erreur lors du chargement du fichier: {message[1]}")
+                    return
                 else:
-                    # Index invalide, désélectionner silencieusement
-                    self.excel_tree.selection_remove(selected_items[0])
-            except (ValueError, IndexError):
-                # Erreur de conversion ou d'index, désélectionner silencieusement
-                if selected_items:
-                    self.excel_tree.selection_remove(selected_items[0])
+                    finished = True
+                    break
+        except queue.Empty:
+            pass
+        
+        self.excel_table.set_row_count(len(self.excel_data))
+        if finished:
+            self.load_cancel_event = None
+            self.load_status_var.set(f"{len(self.excel_data)} contact(s) chargé(s)")
+        else:
+            if self.load_total:
+                self.load_status_var.set(f"Chargement... {len(self.excel_data)} / {self.load_total} ligne(s)")
+            else:
+                self.load_status_var.set(f"Chargement... {len(self.excel_data)} ligne(s)")
+            self.root.after(LOAD_POLL_MS, self.poll_excel_load, load_queue, generation)
+    
+    def cancel_excel_load(self):
+        """Abandonne le chargement en cours, s'il y en a un"""
+        if self.load_cancel_event is not None:
+            self.load_cancel_event.set()
+            self.load_cancel_event = None
+        self.load_generation += 1
+    
+    def get_excel_row_values(self, index):
+        """Valeurs affichées dans le tableau pour une ligne"""
+        row_data = self.excel_data[index]
+        return (
+            row_data.get('prenom', ''),
+            row_data.get('nom', ''),
+            row_data.get('profession', ''),
+            row_data.get('societe', ''),
+            row_data.get('email', '')
+        )
+    
+    def on_excel_row_select(self, index):
+        # Vérifier que l'index est valide
+        if 0 <= index < len(self.excel_data):
+            row_data = self.excel_data[index]
+            
+            # Vérifier que la ligne a des données valides
+            prenom = row_data.get('prenom', '').strip()
+            nom = row_data.get('nom', '').strip()
+            
+            if prenom or nom:  # Au moins un des deux champs requis
+                # Générer le QR code pour cette ligne
+                self.generate_qr_from_row(row_data, index)
+            else:
+                # Désélectionner silencieusement la ligne vide
+                self.excel_table.deselect()
+        else:
+            # Index invalide, désélectionner silencieusement
+            self.excel_table.deselect()
     
     def generate_qr_from_row(self, row_data, index):
         try:
@@ -333,19 +521,41 @@ class QRCodeGeneratorApp:
             vcard_data = create_vcard(prenom, nom, profession, societe, mobile, pro, email, '', site_web)
             
             # Générer le nom de fichier
-            filename = f"{prenom}_{nom}_{index + 1}"
-            filename = "".join(c for c in filename if c.isalnum() or c in (' ', '-', '_')).rstrip()
+            filename = make_filename(prenom, nom, row_data.get(RECORD_NUMBER_FIELD, index + 1))
             
             # Stocker les données actuelles
             self.current_qr_data = vcard_data
             self.current_qr_filename = filename
             
-            # Afficher l'aperçu
-            self.update_qr_preview(vcard_data)
+            # Afficher l'aperçu (calculé en arrière-plan si absent du cache)
+            self.request_preview(vcard_data)
+            
+            # Préparer les aperçus des lignes voisines pendant les temps morts
+            self.prefetch_rows_around(index)
             
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors de la génération du QR code: {e}")
     
+    def row_vcard(self, row_data):
+        """vCard d'une ligne du fichier de contacts"""
+        return create_vcard(
+            row_data.get('prenom', ''), row_data.get('nom', ''), row_data.get('profession', ''),
+            row_data.get('societe', ''), row_data.get('mobile', ''), row_data.get('pro', ''),
+            row_data.get('email', ''), '', row_data.get('site_web', '')
+        )
+    
+    def prefetch_rows_around(self, index):
+        """Programme le calcul des aperçus des lignes voisines (les plus proches d'abord)"""
+        self.preview_prefetch.clear()
+        for offset in range(1, PREFETCH_ROWS + 1):
+            for neighbour in (index + offset, index - offset):
+                if 0 <= neighbour < len(self.excel_data):
+                    row_data = self.excel_data[neighbour]
+                    if row_data.get('prenom', '').strip() or row_data.get('nom', '').strip():
+                        self.preview_prefetch.append(self.row_vcard(row_data))
+        if self.preview_job is None:
+            self.start_preview_job()
+    
     def generate_manual_qr(self):
         try:
             # Récupérer les données des champs
@@ -367,8 +577,7 @@ class QRCodeGeneratorApp:
             vcard_data = create_vcard(prenom, nom, profession, societe, mobile, pro, email, '', site_web)
             
             # Générer le nom de fichier
-            filename = f"{prenom}_{nom}_manual"
-            filename = "".join(c for c in filename if c.isalnum() or c in (' ', '-', '_')).rstrip()
+            filename = make_filename(prenom, nom, "manual")
             
             # Stocker les données actuelles
             self.current_qr_data = vcard_data
@@ -382,33 +591,30 @@ class QRCodeGeneratorApp:
     
     def update_qr_preview(self, data):
         try:
-            # Générer le QR code en mémoire
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(data)
-            qr.make(fit=True)
-            
-            img = qr.make_image(fill_color="black", back_color="white")
-            
-            # Convertir l'image pour l'affichage Tkinter
-            img_buffer = io.BytesIO()
-            img.save(img_buffer, format="PNG")
-            img_buffer.seek(0)
-            
-            tk_img = Image.open(img_buffer)
-            tk_img = tk_img.resize((200, 200), Image.LANCZOS)
-            self.preview_photo = ImageTk.PhotoImage(tk_img)
-            
-            # Mettre à jour l'aperçu
-            self.preview_label.configure(image=self.preview_photo)
+            # Un aperçu en temps réel encore en cours ne doit pas remplacer celui-ci
+            self.cancel_preview_update()
+            entry = self.preview_cache.get(data)
+            if entry is None:
+                entry = render_preview(data)
+                self.preview_cache.put(data, entry)
+            self.show_preview_image(entry[1])
             
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors de la génération de l'aperçu: {e}")
     
+    def show_preview_image(self, preview_img):
+        """Affiche une image d'aperçu (thread Tk uniquement)"""
+        from PIL import ImageTk
+        
+        # Réutiliser la même PhotoImage : l'image Tk est mise à jour sur place
+        if getattr(self, 'preview_photo', None) is None:
+            self.preview_photo = ImageTk.PhotoImage(preview_img)
+        else:
+            self.preview_photo.paste(preview_img)
+        
+        # Mettre à jour l'aperçu
+        self.preview_label.configure(image=self.preview_photo)
+    
     def save_current_qr(self):
         if not self.current_qr_data or not self.current_qr_filename:
             messagebox.showwarning("Aucun QR code", "Veuillez d'abord générer un QR code.")
@@ -441,55 +647,205 @@ class QRCodeGeneratorApp:
     
     def generate_all_qr(self):
         try:
-            file_path = self.excel_path_var.get()
-            if not os.path.exists(file_path):
-                messagebox.showwarning("Fichier introuvable", f"Le fichier {file_path} n'existe pas.")
+            if self.batch_thread is not None and self.batch_thread.is_alive():
                 return
             
-            # Utiliser la fonction existante pour traiter le fichier Excel
-            process_excel_file(file_path)
+            # Les QR codes sont générés à partir des lignes déjà chargées dans le tableau
+            if self.load_cancel_event is not None:
+                messagebox.showwarning("Chargement en cours", "Veuillez attendre la fin du chargement du fichier.")
+                return
+            if not self.excel_data:
+                messagebox.showwarning("Aucune donnée", "Veuillez d'abord charger un fichier de contacts.")
+                return
+            missing_columns = [col for col in REQUIRED_FIELDS if col not in self.excel_headers]
+            if missing_columns:
+                messagebox.showerror("Erreur", f"Colonnes manquantes dans le fichier: {', '.join(missing_columns)}")
+                return
             
-            # Déterminer le dossier de sortie en fonction du mode (compilé ou développement)
+            # Planches d'étiquettes : demander où enregistrer le document PDF
+            output_format = self.output_format_var.get()
+            sheet_path = None
+            archive_path = None
+            if output_format == SHEET_FORMAT:
+                sheet_path = filedialog.asksaveasfilename(
+                    title="Enregistrer les planches d'étiquettes",
+                    defaultextension=".pdf",
+                    initialfile="planches_qr_codes.pdf",
+                    filetypes=[("Document PDF", "*.pdf")]
+                )
+                if not sheet_path:
+                    return
             
-            if getattr(sys, 'frozen', False):
-                # Mode compilé
-                if platform.system() == 'Windows':
-                    user_docs = os.path.join(os.path.expanduser('~'), 'Documents')
-                    output_dir = Path(user_docs) / "Sudalys_QR_Codes"
-                else:
-                    output_dir = Path(os.path.expanduser('~')) / "Sudalys_QR_Codes"
-            else:
-                # Mode développement
-                output_dir = Path("qr_codes")
+            # Mode archive : demander où enregistrer l'archive
+            elif self.archive_output_var.get():
+                archive_path = filedialog.asksaveasfilename(
+                    title="Enregistrer l'archive des QR codes",
+                    defaultextension=".zip",
+                    initialfile="qr_codes.zip",
+                    filetypes=[("Archive ZIP", "*.zip"), ("Archive tar.gz", "*.tar.gz;*.tgz"), ("Archive tar", "*.tar")]
+                )
+                if not archive_path:
+                    return
             
-            messagebox.showinfo("Succès", f"Tous les QR codes ont été générés avec succès dans le dossier:\n{output_dir}")
+            # Lancer la génération dans un thread de travail pour garder la fenêtre réactive
+            self.batch_cancel_event.clear()
+            self.batch_queue = queue.Queue()
+            self.batch_started = time.monotonic()
+            self.batch_progress.configure(value=0, maximum=1)
+            self.batch_status_var.set("Démarrage...")
+            self.generate_all_btn.configure(state=tk.DISABLED)
+            self.batch_cancel_btn.configure(state=tk.NORMAL)
             
-            # Proposer d'ouvrir le dossier contenant les QR codes
-            if messagebox.askyesno("Ouvrir le dossier", "Voulez-vous ouvrir le dossier contenant les QR codes?"):
-                if platform.system() == "Windows":
-                    os.startfile(output_dir)
-                elif platform.system() == "Darwin":  # macOS
-                    subprocess.Popen(["open", output_dir])
-                else:  # Linux
-                    subprocess.Popen(["xdg-open", output_dir])
+            self.batch_thread = threading.Thread(
+                target=self.run_batch,
+                args=(self.excel_data, self.excel_source, archive_path,
+                      self.archive_compress_var.get(), output_format, sheet_path,
+                      self.batch_queue),
+                daemon=True,
+            )
+            self.batch_thread.start()
+            self.root.after(100, self.poll_batch_queue)
             
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors de la génération des QR codes: {e}")
     
+    def run_batch(self, records, source_name, archive_path, archive_compress, output_format,
+                  sheet_path, batch_queue):
+        """Génère tous les QR codes (exécuté dans le thread de travail, sans toucher à Tk)"""
+        def on_progress(done, total):
+            batch_queue.put(("progress", done, total))
+        
+        try:
+            # Un nouveau chargement remplace self.excel_data par une autre liste :
+            # les lignes reçues ici ne changent pas pendant la génération.
+            # Utiliser tous les cœurs ; en mode dossier, ne régénérer que les lignes modifiées
+            if sheet_path is not None:
+                sink = PdfLabelWriter(sheet_path)
+            elif archive_path is not None:
+                sink = ArchiveWriter(archive_path, compress=archive_compress)
+            else:
+                sink = DirectorySink(get_default_output_dir())
+            completed = process_records(
+                records,
+                total=len(records),
+                workers=None,
+                cache=self.render_cache,
+                incremental=isinstance(sink, DirectorySink),
+                source_name=source_name,
+                output_format=output_format,
+                sink=sink,
+                progress=on_progress,
+                cancel_event=self.batch_cancel_event,
+            )
+            batch_queue.put(("done", completed, archive_path, sheet_path))
+        except Exception as e:
+            batch_queue.put(("error", str(e)))
+    
+    def cancel_batch(self):
+        """Demande l'arrêt de la génération en cours (entre deux lignes)"""
+        self.batch_cancel_event.set()
+        self.batch_cancel_btn.configure(state=tk.DISABLED)
+        self.batch_status_var.set("Annulation en cours...")
+    
+    def poll_batch_queue(self):
+        """Lit les messages du thread de travail et met à jour la progression"""
+        last_progress = None
+        finished = None
+        try:
+            while True:
+                message = self.batch_queue.get_nowait()
+                if message[0] == "progress":
+                    last_progress = message
+                else:
+                    finished = message
+        except queue.Empty:
+            pass
+        
+        if last_progress is not None and not self.batch_cancel_event.is_set():
+            _, done, total = last_progress
+            self.update_batch_progress(done, total)
+        
+        if finished is not None:
+            self.finish_batch(finished)
+        else:
+            self.root.after(100, self.poll_batch_queue)
+    
+    def update_batch_progress(self, done, total):
+        """Affiche la progression et le temps restant estimé"""
+        elapsed = time.monotonic() - self.batch_started
+        if total:
+            self.batch_progress.configure(maximum=total, value=min(done, total))
+            remaining = elapsed / done * max(total - done, 0) if done else 0
+            minutes, seconds = divmod(int(remaining), 60)
+            self.batch_status_var.set(f"{done}/{total} - reste environ {minutes:d}:{seconds:02d}")
+        else:
+            self.batch_progress.configure(maximum=done + 1, value=done)
+            self.batch_status_var.set(f"{done} QR code(s) - {done / elapsed if elapsed else 0:.0f}/s")
+    
+    def finish_batch(self, message):
+        """Termine la génération en lot (thread Tk) et affiche le résultat"""
+        self.batch_thread = None
+        self.generate_all_btn.configure(state=tk.NORMAL)
+        self.batch_cancel_btn.configure(state=tk.DISABLED)
+        
+        if message[0] == "error":
+            self.batch_status_var.set("Erreur")
+            messagebox.showerror("Erreur", f"Erreur lors de la génération des QR codes: {message[1]}")
+            return
+        
+        _, completed, archive_path, sheet_path = message
+        if self.batch_cancel_event.is_set():
+            self.batch_status_var.set("Génération annulée")
+            messagebox.showinfo("Annulé", "La génération des QR codes a été annulée.")
+            return
+        if not completed:
+            self.batch_status_var.set("Erreur")
+            messagebox.showerror("Erreur", "La génération des QR codes n'a pas pu aboutir.")
+            return
+        
+        self.batch_progress.configure(value=self.batch_progress.cget("maximum"))
+        self.batch_status_var.set("Génération terminée")
+        
+        if sheet_path:
+            messagebox.showinfo("Succès", f"Les planches d'étiquettes ont été générées:\n{sheet_path}")
+            output_dir = Path(sheet_path).parent
+            question = "Voulez-vous ouvrir le dossier contenant le document PDF?"
+        elif archive_path:
+            messagebox.showinfo("Succès", f"Tous les QR codes ont été générés dans l'archive:\n{archive_path}")
+            output_dir = Path(archive_path).parent
+            question = "Voulez-vous ouvrir le dossier contenant l'archive?"
+        else:
+            # Dossier de sortie en fonction du mode (compilé ou développement)
+            output_dir = get_default_output_dir()
+            messagebox.showinfo("Succès", f"Tous les QR codes ont été générés avec succès dans le dossier:\n{output_dir}")
+            question = "Voulez-vous ouvrir le dossier contenant les QR codes?"
+        
+        # Proposer d'ouvrir le dossier contenant les QR codes
+        if messagebox.askyesno("Ouvrir le dossier", question):
+            if platform.system() == "Windows":
+                os.startfile(output_dir)
+            elif platform.system() == "Darwin":  # macOS
+                subprocess.Popen(["open", output_dir])
+            else:  # Linux
+                subprocess.Popen(["xdg-open", output_dir])
+    
     def clear_manual_form(self):
         """Vide uniquement les champs de saisie manuelle"""
+        self.cancel_preview_update()
         for entry in self.manual_entries.values():
             entry.delete(0, tk.END)
     
     def clear_excel_data(self):
         """Vide les données Excel et remet le chemin par défaut"""
-        # Vider le tableau Excel
-        for item in self.excel_tree.get_children():
-            self.excel_tree.delete(item)
+        # Vider le tableau Excel (et abandonner un chargement en cours)
+        self.cancel_excel_load()
+        self.load_status_var.set("")
+        self.excel_table.clear()
         
         # Vider les données en mémoire
         self.excel_data = []
         self.excel_headers = {}
+        self.excel_source = None
         
         # Remettre le chemin par défaut
         self.excel_path_var.set("contacts.xlsx")
@@ -503,13 +859,15 @@ class QRCodeGeneratorApp:
                 entry.delete(0, tk.END)
         
         # Vider les données Excel
-        if hasattr(self, 'excel_tree'):
-            for item in self.excel_tree.get_children():
-                self.excel_tree.delete(item)
+        if hasattr(self, 'excel_table'):
+            self.cancel_excel_load()
+            self.load_status_var.set("")
+            self.excel_table.clear()
         
         # Réinitialiser toutes les variables de données
         self.excel_data = []
         self.excel_headers = {}
+        self.excel_source = None
         self.current_qr_data = None
         self.current_qr_filename = None
         
@@ -517,7 +875,12 @@ class QRCodeGeneratorApp:
         if hasattr(self, 'excel_path_var'):
             self.excel_path_var.set("contacts.xlsx")
         
-        # Vider l'aperçu du QR code
+        # Vider l'aperçu du QR code (et ignorer un aperçu en cours de calcul)
+        self.cancel_preview_update()
+        self.preview_wanted = None
+        self.preview_prefetch.clear()
+        self.preview_job = None
+        self.preview_cache.clear()
         if hasattr(self, 'preview_label'):
             self.preview_label.configure(image="")
             if hasattr(self, 'preview_photo'):
@@ -526,30 +889,21 @@ class QRCodeGeneratorApp:
         # Pas de message de confirmation pour éviter les popups
     
     def on_manual_field_change(self, event=None):
-        """Génère automatiquement le QR code quand les champs changent"""
-        import time
-        current_time = time.time() * 1000  # Convertir en millisecondes
-        
-        # Optimisation : éviter trop de générations rapprochées
-        if current_time - self.last_update_time < self.update_delay:
-            # Programmer une génération différée
-            self.root.after(self.update_delay, self.delayed_qr_generation)
-            return
-        
-        self.last_update_time = current_time
-        self.generate_realtime_qr()
+        """Programme la génération de l'aperçu après la dernière frappe"""
+        # Un seul minuteur : chaque saisie annule le précédent et le relance
+        self.cancel_preview_update()
+        self.preview_timer = self.root.after(self.update_delay, self.generate_realtime_qr)
     
-    def delayed_qr_generation(self):
-        """Génération différée pour optimiser les performances"""
-        import time
-        current_time = time.time() * 1000
-        
-        # Vérifier si une nouvelle saisie n'a pas eu lieu entre temps
-        if current_time - self.last_update_time >= self.update_delay:
-            self.generate_realtime_qr()
+    def cancel_preview_update(self):
+        """Annule l'aperçu programmé et rend périmé celui en cours de calcul"""
+        if self.preview_timer is not None:
+            self.root.after_cancel(self.preview_timer)
+            self.preview_timer = None
+        self.preview_generation += 1
     
     def generate_realtime_qr(self):
         """Génère le QR code en temps réel pendant la saisie"""
+        self.preview_timer = None
         try:
             # Récupérer les données des champs
             prenom = self.manual_entries["prenom"].get().strip()
@@ -568,29 +922,82 @@ class QRCodeGeneratorApp:
                 vcard_data = create_vcard(prenom, nom, profession, societe, mobile, pro, email, '', site_web)
                 
                 # Générer le nom de fichier
-                filename = f"{prenom}_{nom}_realtime"
-                filename = "".join(c for c in filename if c.isalnum() or c in (' ', '-', '_')).rstrip()
+                filename = make_filename(prenom, nom, "realtime")
                 
                 # Stocker les données actuelles
                 self.current_qr_data = vcard_data
                 self.current_qr_filename = filename
                 
-                # Afficher l'aperçu
-                self.update_qr_preview(vcard_data)
+                # Afficher l'aperçu (calculé en arrière-plan si absent du cache)
+                self.request_preview(vcard_data)
             else:
-                # Vider l'aperçu si pas de données
+                # Vider l'aperçu si pas de données (la PhotoImage est gardée pour la suite)
                 if hasattr(self, 'preview_label'):
                     self.preview_label.configure(image="")
-                    if hasattr(self, 'preview_photo'):
-                        del self.preview_photo
                 
         except Exception as e:
             # En cas d'erreur, ne pas afficher de message pour ne pas gêner la saisie
             pass
     
+    def request_preview(self, data):
+        """
+        Affiche l'aperçu d'une vCard : immédiatement s'il est en cache, sinon
+        dès que le thread d'encodage l'a calculé. Les demandes rapprochées sont
+        regroupées : seule la plus récente est encodée.
+        """
+        self.preview_generation += 1
+        entry = self.preview_cache.get(data)
+        if entry is not None:
+            self.preview_wanted = None
+            self.show_preview_image(entry[1])
+            return
+        
+        self.preview_wanted = (data, self.preview_generation)
+        if self.preview_job is None:
+            self.start_preview_job()
+    
+    def start_preview_job(self):
+        """Lance l'encodage suivant : l'aperçu demandé en priorité, sinon une ligne voisine"""
+        if self.preview_wanted is not None:
+            data, generation = self.preview_wanted
+            self.preview_wanted = None
+        else:
+            # Temps mort : préparer les lignes voisines qui ne sont pas déjà en cache
+            while self.preview_prefetch and self.preview_prefetch[0] in self.preview_cache:
+                self.preview_prefetch.popleft()
+            if not self.preview_prefetch:
+                return
+            data, generation = self.preview_prefetch.popleft(), None
+        
+        self.preview_job = self.preview_executor.submit(render_preview, data)
+        self.root.after(PREVIEW_POLL_MS, self.finish_preview_job, self.preview_job, data, generation)
+    
+    def finish_preview_job(self, future, data, generation):
+        """Récupère un aperçu calculé en arrière-plan et l'affiche s'il est toujours attendu"""
+        if future is not self.preview_job:
+            # Travail abandonné (données vidées)
+            return
+        if not future.done():
+            self.root.after(PREVIEW_POLL_MS, self.finish_preview_job, future, data, generation)
+            return
+        
+        self.preview_job = None
+        try:
+            entry = future.result()
+            self.preview_cache.put(data, entry)
+            if generation is not None and generation == self.preview_generation:
+                self.show_preview_image(entry[1])
+        except Exception:
+            # Comme pour la saisie, pas de message en cas d'erreur
+            pass
+        self.start_preview_job()
+    
     def download_excel_template(self):
         """Crée et télécharge un template Excel avec les colonnes attendues"""
         try:
+            import openpyxl
+            import openpyxl.styles
+            
             # Créer un nouveau classeur Excel
             workbook = openpyxl.Workbook()
             sheet = workbook.active
@@ -659,9 +1066,17 @@ class QRCodeGeneratorApp:
             
 
 def main():
+    parser = argparse.ArgumentParser(description="Générateur de QR Code - Sudalys Services")
+    parser.add_argument("--startup-report", metavar="FICHIER",
+                        help="écrit le temps jusqu'au premier affichage (JSON) puis quitte")
+    args, _ = parser.parse_known_args()
+    
     root = tk.Tk()
     app = QRCodeGeneratorApp(root)
+    app.startup_report = args.startup_report
     root.mainloop()
 
 if __name__ == "__main__":
+    # Nécessaire pour le pool de processus dans l'exécutable PyInstaller
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache disque des QR codes déjà rendus, adressé par le contenu.
+
+Chaque entrée est identifiée par l'empreinte SHA-256 de la vCard, des réglages
+du QR code (version, correction d'erreur, taille des modules, bordure) et de
+la version du moteur de rendu : une vCard identique à un passage précédent
+renvoie directement le SVG final sans aucun encodage.
+
+PreviewCache est le pendant en mémoire, borné en nombre d'entrées, utilisé
+par l'interface pour les aperçus déjà affichés.
+"""
+import os
+import hashlib
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+# Taille maximale par défaut du cache (en octets)
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# Nombre maximal par défaut d'aperçus gardés en mémoire
+DEFAULT_PREVIEW_ENTRIES = 256
+
+# Après un dépassement, on purge jusqu'à cette fraction de la taille maximale
+TRIM_RATIO = 0.9
+
+
+class RenderCache:
+    """
+    Cache persistant clé -> octets du fichier rendu (SVG ou PNG), avec taille
+    maximale et éviction LRU.
+
+    La date de modification des fichiers sert de date de dernier accès : elle
+    est mise à jour à chaque lecture, et les entrées les plus anciennes sont
+    supprimées en premier lors d'une purge.
+    L'objet est sérialisable et peut donc être passé aux processus de travail.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(payload, renderer, **settings):
+        """
+        Calcule la clé d'une entrée à partir de la vCard et des réglages du rendu
+        """
+        hasher = hashlib.sha256()
+        hasher.update(f"renderer={renderer}\n".encode('utf-8'))
+        for name in sorted(settings):
+            hasher.update(f"{name}={settings[name]}\n".encode('utf-8'))
+        hasher.update(b"\n")
+        hasher.update(payload.encode('utf-8') if isinstance(payload, str) else payload)
+        return hasher.hexdigest()
+
+    def _path(self, key, suffix):
+        # Sous-dossiers sur deux caractères pour éviter un dossier unique énorme
+        return self.cache_dir / key[:2] / f"{key}{suffix}"
+
+    def get(self, key, suffix='.svg'):
+        """
+        Renvoie les octets en cache pour cette clé, ou None si absents
+        (suffix : extension du fichier rendu)
+        """
+        path = self._path(key, suffix)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        # Marquer l'entrée comme récemment utilisée
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, data, suffix='.svg'):
+        """
+        Enregistre les octets d'une entrée (écriture atomique)
+        """
+        path = self._path(key, suffix)
+        try:
+            path.parent.mkdir(exist_ok=True, parents=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Le cache est une optimisation : une erreur d'écriture n'est pas bloquante
+            pass
+
+    def _entries(self):
+        """
+        Liste (date d'accès, taille, chemin) de toutes les entrées du cache
+        """
+        entries = []
+        if not self.cache_dir.is_dir():
+            return entries
+        for sub_dir in os.scandir(self.cache_dir):
+            if not sub_dir.is_dir():
+                continue
+            for entry in os.scandir(sub_dir.path):
+                # Fichiers temporaires d'une écriture en cours
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def size(self):
+        """
+        Taille totale actuelle du cache (en octets)
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def trim(self):
+        """
+        Supprime les entrées les moins récemment utilisées si la taille maximale est dépassée.
+        Renvoie le nombre d'entrées supprimées.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+
+        target = self.max_bytes * TRIM_RATIO
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """
+        Vide complètement le cache
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class PreviewCache:
+    """
+    Cache mémoire LRU borné : vCard -> (matrice de modules, image d'aperçu).
+
+    hits / misses comptent les consultations réussies et manquées.
+    Prévu pour être utilisé depuis le seul thread de l'interface.
+    """
+
+    def __init__(self, max_entries=DEFAULT_PREVIEW_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """
+        Renvoie l'entrée de cette clé (et la marque comme récente), ou None si absente
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """
+        Enregistre une entrée, en évinçant la moins récemment utilisée si le cache est plein
+        """
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        # Consultation sans effet sur l'ordre LRU ni sur les compteurs
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """
+        Vide le cache et remet les compteurs à zéro
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
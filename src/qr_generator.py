@@ -1,13 +1,69 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import qrcode.image.svg
 import os
 import sys
 import base64
+import io
+import logging
 import platform
+import unicodedata
+from time import perf_counter
+import multiprocessing
+from collections import deque, namedtuple
 from pathlib import Path
-import openpyxl
 
+from qr_cache import RenderCache
+from qr_manifest import OutputManifest
+from qr_output import (ArchiveWriter, DirectorySink, StreamSink, OutputIndex, parse_shard_layout,
+                       remove_index)
+from qr_pdf import PdfLabelWriter, SheetLayout, DEFAULT_SHEET_LAYOUT, PAGE_SIZES, parse_grid, sheet_qr_side
+from qr_sprite import SvgSpriteWriter
+from qr_render import encode_modules, modules_to_svg, modules_to_png
+from qr_sources import open_contact_source, REQUIRED_FIELDS, RECORD_NUMBER_FIELD
+
+# Messages du traitement en lot (lignes ignorées, bilan...) : rien n'est affiché tant que
+# l'application appelante ne configure pas logging (voir run_cli) ; seules les erreurs
+# qui font échouer le lot sont écrites sur la sortie d'erreur
+logger = logging.getLogger("qr_generator")
+logger.addHandler(logging.NullHandler())
+
+# Nombre de lignes envoyées d'un coup à un processus de travail
+BATCH_CHUNK_SIZE = 16
+
+# Configuration pour QR code 100x100 pixels
+QR_VERSION = 1  # Taille minimale (21x21 modules)
+QR_ERROR_CORRECTION = 1  # qrcode.constants.ERROR_CORRECT_L : correction d'erreur faible
+QR_BOX_SIZE = 4  # 4px par module (21*4 = 84px + bordures = ~100px)
+QR_BORDER = 2  # Bordure de 2 modules (8px)
+
+# Moteurs de rendu SVG disponibles et leur version (à incrémenter si la sortie change, invalide le cache)
+# - "direct" : sérialisation directe de la matrice de modules (qr_render)
+# - "qrcode" : rendu de référence via qrcode.image.svg.SvgPathImage
+SVG_RENDERER_VERSIONS = {
+    "direct": "direct-1",
+    "qrcode": "svgpath-1",
+}
+
+# Moteur de rendu SVG utilisé par défaut
+SVG_RENDERER = "direct"
+
+# Sortie PNG : taille d'un module en pixels et résolution par défaut,
+# version du rendu (à incrémenter si la sortie change, invalide le cache)
+PNG_BOX_SIZE = 10
+PNG_DPI = 300
+PNG_RENDERER_VERSION = "png-1"
+
+# Formats de sortie du traitement en lot
+OUTPUT_FORMATS = ('svg', 'png')
+
+# Choix « planches d'étiquettes PDF » de l'interface (un seul document, voir qr_pdf)
+SHEET_FORMAT = 'pdf'
+
+# Longueur maximale de la partie « prénom_nom » des noms de fichier
+MAX_FILENAME_LENGTH = 100
+
+# Réglages d'un format de sortie (voir get_output_format)
+OutputFormat = namedtuple('OutputFormat', 'name extension box_size border dpi')
 
 
 def create_vcard(prenom, nom, profession, societe, mobile, pro, email, adresse, site_web):
@@ -57,29 +113,10 @@ def create_vcard(prenom, nom, profession, societe, mobile, pro, email, adresse,
     return "\n".join(vcard_lines)
 
 
-def generate_qr_svg(data, filename):
+def get_default_output_dir():
     """
-    Génère un QR code en format SVG de 100x100 pixels
+    Détermine le dossier de sortie des QR codes
     """
-    # Encoder les données en UTF-8 pour éviter les problèmes d'encodage
-    if isinstance(data, str):
-        data = data.encode('utf-8').decode('utf-8')
-    
-    # Configuration pour QR code 100x100 pixels
-    qr = qrcode.QRCode(
-        version=1,  # Taille minimale (21x21 modules)
-        error_correction=qrcode.constants.ERROR_CORRECT_L,  # Correction d'erreur faible
-        box_size=4,  # 4px par module (21*4 = 84px + bordures = ~100px)
-        border=2,   # Bordure de 2 modules (8px)
-    )
-    
-    qr.add_data(data)
-    qr.make(fit=True)
-    
-    factory = qrcode.image.svg.SvgPathImage
-    img = qr.make_image(image_factory=factory)
-    
-    # Déterminer le chemin approprié pour les QR codes
     # Si l'application est compilée en .exe, utiliser le dossier de l'utilisateur
     if getattr(sys, 'frozen', False):
         # L'application est compilée avec PyInstaller
@@ -88,36 +125,236 @@ def generate_qr_svg(data, filename):
         if platform.system() == 'Windows':
             # Sur Windows, utiliser le dossier Documents
             user_docs = os.path.join(os.path.expanduser('~'), 'Documents')
-            output_dir = Path(user_docs) / "Sudalys_QR_Codes"
+            return Path(user_docs) / "Sudalys_QR_Codes"
         else:
             # Sur d'autres systèmes, utiliser le dossier home
-            output_dir = Path(os.path.expanduser('~')) / "Sudalys_QR_Codes"
+            return Path(os.path.expanduser('~')) / "Sudalys_QR_Codes"
     else:
         # En mode développement, utiliser le dossier local
-        output_dir = Path("qr_codes")
+        return Path("qr_codes")
+
+
+def get_default_cache_dir():
+    """
+    Détermine le dossier du cache de rendu (à côté du dossier de sortie)
+    """
+    if getattr(sys, 'frozen', False):
+        return get_default_output_dir().parent / "Sudalys_QR_Cache"
+    return Path("qr_cache")
+
+
+def get_output_format(name='svg', box_size=None, dpi=None):
+    """
+    Réglages de sortie d'un format ("svg" ou "png").
+    box_size (pixels par module) et dpi ne s'appliquent qu'au PNG ; le SVG garde
+    ses dimensions fixes. Un OutputFormat déjà construit est renvoyé tel quel.
+    """
+    if isinstance(name, OutputFormat):
+        return name
+    if name == 'svg':
+        return OutputFormat('svg', '.svg', QR_BOX_SIZE, QR_BORDER, None)
+    if name == 'png':
+        return OutputFormat('png', '.png', box_size or PNG_BOX_SIZE, QR_BORDER,
+                            dpi if dpi is not None else PNG_DPI)
+    raise ValueError(f"Format de sortie inconnu: {name} (formats disponibles: {', '.join(OUTPUT_FORMATS)})")
+
+
+def get_output_key(data, output_format='svg'):
+    """
+    Empreinte du fichier produit pour ces données dans un format de sortie
+    """
+    output_format = get_output_format(output_format)
+    if output_format.name == 'svg':
+        return get_render_key(data)
+    return RenderCache.make_key(
+        data,
+        PNG_RENDERER_VERSION,
+        version=QR_VERSION,
+        error_correction=QR_ERROR_CORRECTION,
+        box_size=output_format.box_size,
+        border=output_format.border,
+        dpi=output_format.dpi,
+    )
+
+
+def get_render_key(data, renderer=None):
+    """
+    Empreinte du SVG produit pour ces données (vCard, réglages et version du rendu)
+    """
+    return RenderCache.make_key(
+        data,
+        SVG_RENDERER_VERSIONS[renderer or SVG_RENDERER],
+        version=QR_VERSION,
+        error_correction=QR_ERROR_CORRECTION,
+        box_size=QR_BOX_SIZE,
+        border=QR_BORDER,
+    )
+
+
+def render_qr_svg(data, cache=None, renderer=None, timings=None):
+    """
+    Génère le contenu SVG (octets UTF-8) d'un QR code de 100x100 pixels
     
-    # Créer le dossier de sortie s'il n'existe pas
-    output_dir.mkdir(exist_ok=True, parents=True)
+    cache : RenderCache optionnel, consulté avant tout encodage
+    renderer : moteur de rendu ("direct" ou "qrcode"), SVG_RENDERER par défaut
+    timings : dictionnaire optionnel complété avec la durée de chaque étape
+        ("cache", "encode", "render", en secondes)
+    """
+    renderer = renderer or SVG_RENDERER
+    if renderer not in SVG_RENDERER_VERSIONS:
+        raise ValueError(f"Moteur de rendu SVG inconnu: {renderer}")
     
-    # Sauvegarder le fichier SVG avec encodage UTF-8
-    filepath = output_dir / f"{filename}.svg"
-    with open(filepath, 'wb') as f:
-        img.save(f)
+    key = None
+    if cache is not None:
+        started = perf_counter()
+        key = get_render_key(data, renderer)
+        svg_bytes = cache.get(key)
+        if timings is not None:
+            timings['cache'] = timings.get('cache', 0.0) + perf_counter() - started
+        if svg_bytes is not None:
+            return svg_bytes
     
-    # Corriger l'encodage du fichier SVG généré
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            svg_content = f.read()
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(svg_content)
-    except UnicodeDecodeError:
-        # Si erreur d'encodage, essayer avec latin-1 puis sauver en UTF-8
-        with open(filepath, 'r', encoding='latin-1') as f:
-            svg_content = f.read()
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(svg_content)
+    if renderer == "direct":
+        # Sérialisation directe de la matrice, en une seule passe
+        started = perf_counter()
+        modules = encode_modules(data, QR_VERSION, QR_ERROR_CORRECTION)
+        encoded = perf_counter()
+        svg_bytes = modules_to_svg(modules, QR_BOX_SIZE, QR_BORDER)
+        if timings is not None:
+            timings['encode'] = timings.get('encode', 0.0) + encoded - started
+            timings['render'] = timings.get('render', 0.0) + perf_counter() - encoded
+    else:
+        # Moteur de référence, importé seulement s'il est utilisé
+        import qrcode.image.svg
+        
+        # Configuration pour QR code 100x100 pixels
+        qr = qrcode.QRCode(
+            version=QR_VERSION,
+            error_correction=QR_ERROR_CORRECTION,
+            box_size=QR_BOX_SIZE,
+            border=QR_BORDER,
+        )
+        
+        started = perf_counter()
+        qr.add_data(data)
+        qr.make(fit=True)
+        encoded = perf_counter()
+        
+        factory = qrcode.image.svg.SvgPathImage
+        img = qr.make_image(image_factory=factory)
+        
+        # SvgPathImage écrit directement en UTF-8
+        buffer = io.BytesIO()
+        img.save(buffer)
+        svg_bytes = buffer.getvalue()
+        if timings is not None:
+            timings['encode'] = timings.get('encode', 0.0) + encoded - started
+            timings['render'] = timings.get('render', 0.0) + perf_counter() - encoded
+    
+    if cache is not None:
+        started = perf_counter()
+        cache.put(key, svg_bytes)
+        if timings is not None:
+            timings['cache'] = timings.get('cache', 0.0) + perf_counter() - started
+    
+    return svg_bytes
+
+
+def render_qr_png(data, output_format='png', cache=None, timings=None):
+    """
+    Génère le contenu PNG (1 bit) d'un QR code, directement depuis la matrice de modules
+    
+    output_format : réglages PNG (voir get_output_format)
+    cache, timings : comme pour render_qr_svg
+    """
+    output_format = get_output_format(output_format)
+    
+    key = None
+    if cache is not None:
+        started = perf_counter()
+        key = get_output_key(data, output_format)
+        png_bytes = cache.get(key, output_format.extension)
+        if timings is not None:
+            timings['cache'] = timings.get('cache', 0.0) + perf_counter() - started
+        if png_bytes is not None:
+            return png_bytes
+    
+    started = perf_counter()
+    modules = encode_modules(data, QR_VERSION, QR_ERROR_CORRECTION)
+    encoded = perf_counter()
+    png_bytes = modules_to_png(modules, output_format.box_size, output_format.border, output_format.dpi)
+    if timings is not None:
+        timings['encode'] = timings.get('encode', 0.0) + encoded - started
+        timings['render'] = timings.get('render', 0.0) + perf_counter() - encoded
+    
+    if cache is not None:
+        started = perf_counter()
+        cache.put(key, png_bytes, output_format.extension)
+        if timings is not None:
+            timings['cache'] = timings.get('cache', 0.0) + perf_counter() - started
+    
+    return png_bytes
+
+
+def render_qr(data, output_format='svg', cache=None, timings=None):
+    """
+    Génère le contenu d'un QR code dans le format de sortie demandé ("svg" ou "png")
+    """
+    output_format = get_output_format(output_format)
+    if output_format.name == 'png':
+        return render_qr_png(data, output_format, cache=cache, timings=timings)
+    return render_qr_svg(data, cache=cache, timings=timings)
+
+
+def generate_qr_svg(data, filename, cache=None, timings=None, output_dir=None):
+    """
+    Génère un QR code en format SVG de 100x100 pixels
+    
+    timings : dictionnaire optionnel complété avec la durée de chaque étape (voir render_qr_svg)
+    output_dir : dossier de sortie (par défaut, voir get_default_output_dir)
+    """
+    return generate_qr_file(data, filename, 'svg', cache=cache, timings=timings, output_dir=output_dir)
+
+
+def generate_qr_file(data, filename, output_format='svg', cache=None, timings=None, output_dir=None):
+    """
+    Génère le fichier d'un QR code dans le format de sortie demandé
+    (nom du fichier sans extension) et renvoie son chemin
+    
+    output_dir : dossier de sortie, ou DirectorySink déjà préparé
+    """
+    output_format = get_output_format(output_format)
+    return _write_qr_file(get_output_sink(output_dir), data, filename, output_format, cache, timings)
+
+
+def get_output_sink(output_dir=None, shard_layout=None):
+    """
+    Sortie dossier (créé si besoin) pour output_dir, ou pour le dossier par défaut.
+    Une DirectorySink est renvoyée telle quelle.
+    
+    shard_layout : répartition des fichiers en sous-dossiers (voir qr_output.ShardLayout)
+    """
+    if isinstance(output_dir, DirectorySink):
+        return output_dir
+    return DirectorySink(Path(output_dir) if output_dir is not None else get_default_output_dir(),
+                         shard_layout)
+
+
+def _write_qr_file(sink, data, filename, output_format, cache=None, timings=None):
+    """
+    Rend un QR code et l'ajoute à la sortie ; renvoie ce que renvoie sink.add
+    (le chemin du fichier pour une DirectorySink)
+    """
+    file_bytes = render_qr(data, output_format, cache=cache, timings=timings)
+    
+    # Sauvegarder le fichier (le SVG est déjà encodé en UTF-8)
+    started = perf_counter()
+    result = sink.add(f"{filename}{output_format.extension}", file_bytes)
     
-    return filepath
+    if timings is not None:
+        timings['write'] = timings.get('write', 0.0) + perf_counter() - started
+    
+    return result
 
 
 def is_empty_cell(cell):
@@ -139,86 +376,846 @@ def get_cell_value(cell):
     return str(cell.value).strip() if cell.value is not None else ''
 
 
-def process_excel_file(excel_path):
+def _generate_qr_chunk(jobs, sink, cache=None, timed=False, output_format='svg'):
+    """
+    Génère les fichiers QR code d'un lot de (vCard, nom de fichier) dans une DirectorySink.
+    Avec timed, renvoie (chemin, durées par étape) au lieu du chemin seul.
+    Exécutée dans un processus de travail : doit rester au niveau du module.
+    """
+    if not timed:
+        return [_write_qr_file(sink, vcard_data, filename, output_format, cache)
+                for vcard_data, filename in jobs]
+    
+    results = []
+    for vcard_data, filename in jobs:
+        timings = {}
+        results.append((_write_qr_file(sink, vcard_data, filename, output_format, cache, timings), timings))
+    return results
+
+
+def _render_qr_chunk(jobs, cache=None, timed=False, output_format='svg'):
+    """
+    Rend en mémoire les QR codes d'un lot de (vCard, nom de fichier) : renvoie (nom de fichier, octets).
+    Avec timed, renvoie (nom de fichier, octets, durées par étape).
+    Exécutée dans un processus de travail : doit rester au niveau du module.
+    """
+    if not timed:
+        return [(filename, render_qr(vcard_data, output_format, cache=cache)) for vcard_data, filename in jobs]
+    
+    results = []
+    for vcard_data, filename in jobs:
+        timings = {}
+        results.append((filename, render_qr(vcard_data, output_format, cache=cache, timings=timings), timings))
+    return results
+
+
+def _encode_qr_chunk(jobs, timed=False):
+    """
+    Encode les QR codes d'un lot de (vCard, nom de fichier) : renvoie (nom de fichier, matrice de modules).
+    Avec timed, renvoie (nom de fichier, matrice, durées par étape).
+    Exécutée dans un processus de travail : doit rester au niveau du module.
+    """
+    results = []
+    for vcard_data, filename in jobs:
+        started = perf_counter()
+        modules = encode_modules(vcard_data, QR_VERSION, QR_ERROR_CORRECTION)
+        if timed:
+            results.append((filename, modules, {'encode': perf_counter() - started}))
+        else:
+            results.append((filename, modules))
+    return results
+
+
+def _run_in_order(chunk_func, jobs, workers, *args):
+    """
+    Applique chunk_func aux travaux par lots, éventuellement sur un pool de processus,
+    et renvoie les résultats au fur et à mesure, dans l'ordre des travaux.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    if workers <= 1:
+        for job in jobs:
+            yield from chunk_func([job], *args)
+        return
+    
+    # Import différé : inutile en mode séquentiel
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Limiter le nombre de lots en vol pour garder une mémoire bornée
+        pending = deque()
+        chunk = []
+        for job in jobs:
+            chunk.append(job)
+            if len(chunk) >= BATCH_CHUNK_SIZE:
+                pending.append(executor.submit(chunk_func, chunk, *args))
+                chunk = []
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+        if chunk:
+            pending.append(executor.submit(chunk_func, chunk, *args))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def generate_qr_batch(jobs, workers=1, cache=None, timed=False, output_dir=None, output_format='svg'):
+    """
+    Génère les QR codes d'une suite de (vCard, nom de fichier), au format output_format.
+
+    Avec workers > 1, l'encodage et le rendu SVG sont répartis sur un pool de
+    processus ; workers=None utilise tous les cœurs disponibles.
+    output_dir : dossier de sortie ou DirectorySink, préparé une seule fois pour tout le lot
+    Les chemins des fichiers sont renvoyés au fur et à mesure, dans l'ordre des travaux
+    (avec timed, des couples (chemin, durées par étape)).
+    """
+    return _run_in_order(_generate_qr_chunk, jobs, workers, get_output_sink(output_dir), cache, timed,
+                         get_output_format(output_format))
+
+
+def render_qr_batch(jobs, workers=1, cache=None, timed=False, output_format='svg'):
+    """
+    Comme generate_qr_batch, mais sans écrire de fichier :
+    renvoie (nom de fichier, octets) au fur et à mesure, dans l'ordre des travaux
+    (avec timed, des triplets (nom de fichier, octets, durées par étape)).
+    """
+    return _run_in_order(_render_qr_chunk, jobs, workers, cache, timed, get_output_format(output_format))
+
+
+def encode_qr_batch(jobs, workers=1, timed=False):
+    """
+    Comme render_qr_batch, mais renvoie la matrice de modules de chaque QR code :
+    (nom de fichier, matrice) au fur et à mesure, dans l'ordre des travaux
+    (avec timed, des triplets (nom de fichier, matrice, durées par étape)).
+    """
+    return _run_in_order(_encode_qr_chunk, jobs, workers, timed)
+
+
+def make_filename(prenom, nom, number):
+    """
+    Nom de fichier (sans extension) d'une fiche : « prénom_nom_numéro », limité
+    aux lettres, chiffres, espaces, tirets et soulignés.
+    
+    Le numéro de la fiche, toujours en dernier, rend le nom unique dans le lot
+    (entre fichiers de contacts, voir process_records) et ne laisse jamais un nom
+    réservé par Windows (CON, NUL...). Le texte est normalisé (NFC) : un nom saisi
+    avec des accents composés ou décomposés donne le même fichier ; il est tronqué
+    pour rester sous les limites de longueur des systèmes de fichiers.
+    """
+    name = unicodedata.normalize('NFC', f"{prenom}_{nom}")
+    name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_'))[:MAX_FILENAME_LENGTH]
+    return f"{name}_{number}"
+
+
+def iter_contact_jobs(contacts, timer=None, captions=None, on_skip=None):
+    """
+    Transforme une suite de fiches contact en travaux (vCard, nom de fichier), dans l'ordre.
+    Les lignes sans nom ni prénom sont ignorées (avertissement par logging, avec le
+    numéro de ligne dans le fichier si la source le fournit, voir qr_sources).
+    Chaque fichier est numéroté par la position de sa fiche dans la suite, ou par
+    son champ RECORD_NUMBER_FIELD s'il est présent (fiches déjà filtrées).
+    
+    timer : StageTimer optionnel, reçoit les durées de lecture et de construction des vCards
+    captions : deque optionnelle, reçoit la légende « prénom nom » de chaque travail produit
+    on_skip : fonction optionnelle appelée (sans argument) pour chaque ligne ignorée
+    """
+    source = contacts
+    contacts = iter(contacts)
+    index = -1
+    while True:
+        started = perf_counter()
+        contact = next(contacts, None)
+        parsed = perf_counter()
+        if contact is None:
+            break
+        index += 1
+        
+        # Récupérer les champs obligatoires
+        prenom = contact.get('prenom', '')
+        nom = contact.get('nom', '')
+        
+        # Ignorer les lignes sans nom ni prénom
+        if not prenom and not nom:
+            if timer is not None:
+                timer.add('parse', parsed - started)
+            line_number = getattr(source, 'line_number', None)
+            if line_number is not None:
+                logger.warning("Ligne %d ignorée: nom et prénom manquants", line_number)
+            else:
+                logger.warning("Fiche %d ignorée: nom et prénom manquants",
+                               contact.get(RECORD_NUMBER_FIELD) or index + 1)
+            if on_skip is not None:
+                on_skip()
+            continue
+        
+        # Créer la vCard
+        vcard_data = create_vcard(
+            prenom, nom,
+            contact.get('profession', ''),
+            contact.get('societe', ''),
+            contact.get('mobile', ''),
+            contact.get('pro', ''),
+            contact.get('email', ''),
+            contact.get('adresse', ''),
+            contact.get('site_web', ''),
+        )
+        
+        # Générer le nom de fichier
+        filename = make_filename(prenom, nom, contact.get(RECORD_NUMBER_FIELD) or index + 1)
+        
+        if timer is not None:
+            timer.add('parse', parsed - started, filename)
+            timer.add('vcard', perf_counter() - parsed, filename)
+        
+        if captions is not None:
+            captions.append(f"{prenom} {nom}".strip())
+        
+        yield vcard_data, filename
+
+
+def iter_qr_files(contacts, workers=1, cache=None, output_format='svg', timer=None):
     """
-    Lit le fichier Excel et génère un QR code pour chaque ligne
+    Génère en mémoire le QR code de chaque fiche contact (dictionnaires champ -> texte,
+    comme ceux produits par qr_sources) et renvoie au fur et à mesure, dans l'ordre,
+    des couples (nom de fichier avec extension, octets), sans rien écrire sur le disque.
+    
+    workers, cache, output_format : voir process_excel_file
+    timer : StageTimer optionnel pour chronométrer chaque étape
+    """
+    output_format = get_output_format(output_format)
+    extension = output_format.extension
+    jobs = iter_contact_jobs(contacts, timer=timer)
+    timed = timer is not None
+    for result in render_qr_batch(jobs, workers=workers, cache=cache, timed=timed,
+                                  output_format=output_format):
+        if timed:
+            timer.add_many(result[2], result[0])
+        yield f"{result[0]}{extension}", result[1]
+
+
+def process_excel_file(excel_path, workers=1, cache=None, incremental=False, timer=None,
+                       progress=None, cancel_event=None, verbose=True, output_format='svg',
+                       sink=None, source_name=None):
+    """
+    Lit le fichier de contacts et génère un QR code pour chaque ligne
+    
+    Le format est déduit de l'extension : Excel (.xlsx), CSV, TSV ou JSON Lines.
+    workers : nombre de processus utilisés pour la génération (None = tous les cœurs)
+    cache : RenderCache optionnel pour réutiliser les SVG déjà rendus
+    incremental : ne régénère que les lignes nouvelles ou modifiées depuis
+        l'exécution précédente (d'après le manifeste du dossier de sortie)
+    timer : StageTimer optionnel pour chronométrer chaque étape (résumé affiché en fin de lot)
+    progress, cancel_event : suivi et annulation du lot (voir process_records)
+    verbose : signale (logger.info) chaque QR code généré
+    output_format : "svg", "png" ou OutputFormat (voir get_output_format), pour les
+        sorties qui reçoivent des fichiers
+    sink : sortie du lot (voir qr_output) : DirectorySink (éventuellement répartie en
+        sous-dossiers, avec l'index qr_index.csv), ArchiveWriter, StreamSink, MemorySink,
+        ou document unique (qr_pdf.PdfLabelWriter, qr_sprite.SvgSpriteWriter).
+        Par défaut, un dossier (voir get_default_output_dir). La sortie est fermée en
+        fin de lot, et abandonnée si le lot échoue ou est annulé.
+    source_name : identifiant de la source des lignes dans le manifeste (par défaut,
+        le chemin du fichier de contacts) ; en mode incrémental, seuls les fichiers
+        obsolètes de cette source sont supprimés du dossier de sortie ; dans tous les
+        cas, une ligne dont le fichier appartient déjà à une autre source (d'après le
+        manifeste) est nommée « nom-étiquette » plutôt que de le réécrire
+    
+    Renvoie True si toutes les lignes ont été traitées, False sinon.
     """
     try:
-        # Lire le fichier Excel avec openpyxl
-        workbook = openpyxl.load_workbook(excel_path, data_only=True)
-        sheet = workbook.active
-        
-        # Trouver les en-têtes de colonnes
-        headers = {}
-        for col_idx, cell in enumerate(next(sheet.iter_rows(min_row=1, max_row=1)), 1):
-            if cell.value:
-                headers[cell.value.lower()] = col_idx - 1
-        
-        # Vérifier que les colonnes nécessaires existent
-        required_columns = ['prenom', 'nom']
-        missing_columns = [col for col in required_columns if col not in headers]
-        
-        if missing_columns:
-            print(f"Colonnes manquantes dans le fichier Excel: {missing_columns}")
-            print(f"Colonnes disponibles: {list(headers.keys())}")
-            return
-        
-        # Compter le nombre de lignes avec des données (en excluant l'en-tête)
-        data_rows = list(sheet.iter_rows(min_row=2))
-        print(f"Traitement de {len(data_rows)} entrées...")
-        
-        # Générer un QR code pour chaque ligne
-        for index, row in enumerate(data_rows):
-            # Récupérer les champs obligatoires
-            prenom_idx = headers.get('prenom', -1)
-            nom_idx = headers.get('nom', -1)
-            
-            prenom = get_cell_value(row[prenom_idx]) if prenom_idx >= 0 else ''
-            nom = get_cell_value(row[nom_idx]) if nom_idx >= 0 else ''
-            
-            # Ignorer les lignes sans nom ni prénom
-            if not prenom and not nom:
-                print(f"Ligne {index + 2} ignorée: nom et prénom manquants")
-                continue
-            
-            # Récupérer les champs optionnels
-            profession = get_cell_value(row[headers.get('profession', -1)]) if 'profession' in headers else ''
-            societe = get_cell_value(row[headers.get('societe', -1)]) if 'societe' in headers else ''
-            mobile = get_cell_value(row[headers.get('mobile', -1)]) if 'mobile' in headers else ''
-            pro = get_cell_value(row[headers.get('pro', -1)]) if 'pro' in headers else ''
-            email = get_cell_value(row[headers.get('email', -1)]) if 'email' in headers else ''
-            adresse = get_cell_value(row[headers.get('adresse', -1)]) if 'adresse' in headers else ''
-            site_web = get_cell_value(row[headers.get('site_web', -1)]) if 'site_web' in headers else ''
-            
-            # Créer la vCard
-            vcard_data = create_vcard(prenom, nom, profession, societe, mobile, pro, email, adresse, site_web)
+        # Lire le fichier en flux (openpyxl en lecture seule pour Excel)
+        with open_contact_source(excel_path) as source:
+            return process_contacts(source, workers=workers, cache=cache, incremental=incremental,
+                                    timer=timer, progress=progress, cancel_event=cancel_event,
+                                    verbose=verbose, output_format=output_format, sink=sink,
+                                    source_name=source_name)
+        
+    except FileNotFoundError:
+        print(f"Fichier de contacts non trouvé: {excel_path}", file=sys.stderr)
+    except Exception as e:
+        print(f"Erreur lors du traitement: {e}", file=sys.stderr)
+    
+    # Lot non traité : ne pas laisser une sortie vide ou incomplète
+    if sink is not None:
+        sink.discard()
+        sink.close()
+    return False
+
+
+def process_contacts(source, workers=1, cache=None, incremental=False, timer=None,
+                     progress=None, cancel_event=None, verbose=True, output_format='svg',
+                     sink=None, source_name=None):
+    """
+    Génère un QR code pour chaque fiche d'une source de contacts (voir qr_sources)
+    
+    Les fiches sont lues une par une : la génération démarre dès la première
+    ligne et la mémoire reste constante quelle que soit la taille du fichier.
+    
+    Les paramètres sont ceux de process_records ; source_name vaut par défaut
+    le chemin absolu du fichier de la source.
+    
+    Renvoie True si toutes les lignes ont été traitées, False sinon.
+    """
+    headers = source.headers
+    
+    # Vérifier que les colonnes nécessaires existent
+    missing_columns = [col for col in REQUIRED_FIELDS if col not in headers]
+    
+    if missing_columns:
+        print(f"Colonnes manquantes dans le fichier: {missing_columns}", file=sys.stderr)
+        print(f"Colonnes disponibles: {list(headers.keys())}", file=sys.stderr)
+        if sink is not None:
+            sink.discard()
+            sink.close()
+        return False
+    
+    if source_name is None:
+        source_name = os.path.abspath(source.path)
+    
+    # Nombre de lignes annoncé par le fichier (en excluant l'en-tête)
+    return process_records(source, total=source.row_count, workers=workers, cache=cache,
+                           incremental=incremental, timer=timer, progress=progress,
+                           cancel_event=cancel_event, verbose=verbose,
+                           output_format=output_format, sink=sink, source_name=source_name)
+
+
+def process_records(records, total=None, workers=1, cache=None, incremental=False, timer=None,
+                    progress=None, cancel_event=None, verbose=True, output_format='svg',
+                    sink=None, source_name=None):
+    """
+    Génère un QR code pour chaque fiche contact d'un itérable déjà lu
+    (dictionnaires champ -> texte, comme ceux produits par qr_sources)
+    
+    Les fiches sont consommées une par une, dans l'ordre ; la numérotation des
+    fichiers suit leur position dans l'itérable, sauf pour les fiches qui portent
+    leur position dans le fichier d'origine (champ qr_sources.RECORD_NUMBER_FIELD).
+    
+    total : nombre de fiches attendu (progression), None s'il est inconnu
+    workers, cache, incremental, timer, verbose, output_format, sink,
+    source_name : voir process_excel_file
+    progress : fonction optionnelle appelée avec (lignes traitées, total ou None)
+        après chaque ligne, y compris les lignes ignorées (les lignes ignorées sont
+        comptées dès leur lecture, les autres dans l'ordre des lignes)
+    cancel_event : threading.Event optionnel ; s'il est levé, plus aucune ligne
+        n'est lue, les lignes en cours sont terminées et le lot s'arrête proprement
+    
+    Renvoie True si toutes les lignes ont été traitées, False sinon.
+    """
+    if total is not None:
+        logger.info("Traitement de %d entrées...", total)
+    else:
+        logger.info("Traitement des entrées...")
+    
+    # Sortie choisie une seule fois pour tout le lot (dossier créé, archive ouverte)
+    if sink is None:
+        sink = get_output_sink()
+    
+    # Dossier réparti en sous-dossiers : index des fichiers (contact -> chemin)
+    sharded = isinstance(sink, DirectorySink) and sink.shard_layout is not None
+    
+    # Légendes des documents uniques (planches PDF, sprite) et de l'index, consommées dans l'ordre
+    captions = deque() if sink.wants_modules or sharded else None
+    timed = timer is not None
+    done_count = 0
+    
+    def report_progress():
+        nonlocal done_count
+        done_count += 1
+        if progress is not None:
+            progress(done_count, total)
+    
+    # Les lignes ignorées comptent aussi : la progression atteint le total annoncé
+    jobs = iter_contact_jobs(records, timer=timer, captions=captions, on_skip=report_progress)
+    
+    # En cas d'annulation, arrêter simplement la lecture des lignes
+    if cancel_event is not None:
+        def until_cancelled(all_jobs):
+            for job in all_jobs:
+                if cancel_event.is_set():
+                    return
+                yield job
+        
+        jobs = until_cancelled(jobs)
+    
+    def is_cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+    
+    # Documents uniques (planches PDF, sprite SVG) : chaque QR code y est ajouté dès qu'il
+    # est encodé, et écrit au fil de l'eau (page par page, symbole par symbole)
+    if sink.wants_modules:
+        if incremental:
+            logger.warning("Mode incrémental ignoré: la sortie est un document unique")
+        with sink:
+            for result in encode_qr_batch(jobs, workers=workers, timed=timed):
+                filename, modules = result[0], result[1]
+                started = perf_counter()
+                sink.add(filename, modules, captions.popleft())
+                if timed:
+                    timer.add_many(result[2], filename)
+                    timer.add('render', perf_counter() - started, filename)
+                report_progress()
             
-            # Générer le nom de fichier
-            filename = f"{prenom}_{nom}_{index + 1}"
-            filename = "".join(c for c in filename if c.isalnum() or c in (' ', '-', '_')).rstrip()
+            if is_cancelled():
+                # Ne pas laisser un document incomplet
+                sink.discard()
+                logger.warning("Génération annulée: document incomplet supprimé")
+                return False
+        logger.info("%s", sink.describe())
+        
+        _log_timing_summary(timer)
+        logger.info("Génération terminée!")
+        return True
+    
+    # Les autres sorties reçoivent des fichiers rendus (le format ne concerne pas les documents)
+    output_format = get_output_format(output_format)
+    extension = output_format.extension
+    
+    # Sorties hors dossier (archive, mémoire, flux) : chaque QR code y est ajouté dès qu'il est rendu
+    if not isinstance(sink, DirectorySink):
+        if incremental:
+            logger.warning("Mode incrémental ignoré: la sortie n'est pas un dossier")
+        with sink:
+            for result in render_qr_batch(jobs, workers=workers, cache=cache, timed=timed,
+                                          output_format=output_format):
+                filename, file_bytes = result[0], result[1]
+                started = perf_counter()
+                sink.add(f"{filename}{extension}", file_bytes)
+                if timed:
+                    timer.add_many(result[2], filename)
+                    timer.add('write', perf_counter() - started, filename)
+                report_progress()
             
-            # Générer le QR code
-            filepath = generate_qr_svg(vcard_data, filename)
-            print(f"QR code généré: {filepath}")
+            if is_cancelled():
+                # Ne pas laisser une sortie incomplète
+                sink.discard()
+                logger.warning("Génération annulée: sortie incomplète abandonnée")
+                return False
+        logger.info("%s", sink.describe())
         
-        print("Génération terminée!")
+        if cache is not None:
+            cache.trim()
+        _log_timing_summary(timer)
+        logger.info("Génération terminée!")
+        return True
+    
+    # Le manifeste indique les fichiers de chaque source du dossier (mis à jour en mode incrémental).
+    # Un fichier d'une autre source (même nom et même numéro de ligne dans un autre fichier de
+    # contacts) n'est jamais réécrit, même hors mode incrémental : la ligne prend un nom propre
+    # à sa source
+    manifest = OutputManifest(sink.path, source=source_name)
+    unchanged_count = 0
+    
+    def claim_filenames(all_jobs):
+        for vcard_data, filename in all_jobs:
+            if manifest.owner(sink.relative_path(f"{filename}{extension}")) is not None:
+                filename = f"{filename}-{manifest.tag}"
+            yield vcard_data, filename
+    
+    jobs = claim_filenames(jobs)
+    
+    # Chaque fiche est inscrite à l'index, qu'elle soit régénérée ou non
+    if sharded:
+        def record_index(all_jobs):
+            for vcard_data, filename in all_jobs:
+                index.add(captions.popleft(), sink.relative_path(f"{filename}{extension}"))
+                yield vcard_data, filename
         
-    except FileNotFoundError:
-        print(f"Fichier Excel non trouvé: {excel_path}")
-    except Exception as e:
-        print(f"Erreur lors du traitement: {e}")
+        jobs = record_index(jobs)
+    
+    # En mode incrémental, écarter les lignes inchangées depuis l'exécution précédente
+    if incremental:
+        def filter_changed(all_jobs):
+            nonlocal unchanged_count
+            for vcard_data, filename in all_jobs:
+                content_hash = get_output_key(vcard_data, output_format)
+                relative_path = sink.relative_path(f"{filename}{extension}")
+                unchanged = manifest.is_unchanged(filename, content_hash, relative_path)
+                manifest.record(filename, content_hash, relative_path)
+                if unchanged:
+                    unchanged_count += 1
+                    report_progress()
+                    continue
+                yield vcard_data, filename
+        
+        jobs = filter_changed(jobs)
+    
+    # Générer un QR code pour chaque ligne (en parallèle si demandé)
+    index = OutputIndex(sink.path) if sharded else None
+    try:
+        for result in generate_qr_batch(jobs, workers=workers, cache=cache, timed=timed,
+                                        output_dir=sink, output_format=output_format):
+            if timed:
+                filepath, timings = result
+                timer.add_many(timings, filepath.stem)
+            else:
+                filepath = result
+            if verbose:
+                logger.info("QR code généré: %s", filepath)
+            report_progress()
+    except BaseException:
+        # Lot interrompu par une erreur : ne pas laisser l'index temporaire
+        if index is not None:
+            index.discard()
+        raise
+    
+    cancelled = is_cancelled()
+    
+    if index is not None:
+        if cancelled:
+            index.discard()
+        else:
+            index.commit()
+            logger.info("Index des fichiers: %s", index.path)
+    elif not cancelled:
+        # Dossier à plat : un index d'une répartition précédente ne correspondrait plus
+        remove_index(sink.path)
+    
+    # Nettoyer les fichiers des lignes supprimées et mémoriser l'état courant
+    if incremental:
+        if cancelled:
+            # Lot partiel : conserver les lignes non atteintes telles quelles
+            manifest.save(keep_previous=True)
+        else:
+            removed_count = manifest.remove_stale_files()
+            manifest.save()
+            logger.info("%d QR code(s) inchangé(s), %d fichier(s) obsolète(s) supprimé(s)",
+                        unchanged_count, removed_count)
+    
+    # Respecter la taille maximale du cache une fois le lot terminé
+    if cache is not None:
+        cache.trim()
+    
+    _log_timing_summary(timer)
+    if cancelled:
+        logger.warning("Génération annulée après %d ligne(s)", done_count)
+        return False
+    logger.info("Génération terminée!")
+    return True
 
 
-def main():
+def _log_timing_summary(timer):
     """
-    Fonction principale
+    Transmet au logger le résumé du chronométrage par étape, si demandé
+    """
+    if timer is None:
+        return
+    timer.stop()
+    logger.info("%s", timer.format_text())
+
+
+# Formats d'archive proposés en ligne de commande (extension du fichier produit)
+CLI_ARCHIVE_FORMATS = ('zip', 'tar', 'tar.gz')
+
+# Codes de retour de la ligne de commande
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_INTERRUPTED = 130
+
+# Intervalle minimal (secondes) entre deux messages de progression
+CLI_PROGRESS_INTERVAL = 0.5
+
+
+def build_arg_parser():
     """
-    print("=== Générateur de QR codes vCard ===")
+    Options de la ligne de commande
+    """
+    import argparse
     
-    # Le excel est a la racine "contacts.xlsx"
-    excel_path = "contacts.xlsx"
-    process_excel_file(excel_path)
+    parser = argparse.ArgumentParser(
+        prog="qr_generator",
+        description="Génère un QR code vCard (SVG) pour chaque contact d'un ou plusieurs fichiers "
+                    "(Excel, CSV, TSV ou JSON Lines).",
+    )
+    parser.add_argument("inputs", nargs="*", metavar="FICHIER",
+                        help="fichiers de contacts à traiter (par défaut : contacts.xlsx)")
+    parser.add_argument("-o", "--output", metavar="DOSSIER",
+                        help="dossier de sortie (par défaut : qr_codes, ou Documents/Sudalys_QR_Codes "
+                             "pour l'exécutable) ; un sous-dossier par fichier s'il y en a plusieurs ; "
+                             "« - » écrit une archive tar en flux sur la sortie standard")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="svg",
+                        help="format des QR codes produits (défaut : svg)")
+    parser.add_argument("--module-size", type=int, metavar="PIXELS",
+                        help=f"PNG : taille d'un module en pixels (défaut : {PNG_BOX_SIZE})")
+    parser.add_argument("--dpi", type=int,
+                        help=f"PNG : résolution indiquée dans le fichier (défaut : {PNG_DPI})")
+    single_file = parser.add_mutually_exclusive_group()
+    single_file.add_argument("--archive", choices=CLI_ARCHIVE_FORMATS,
+                             help="regrouper les QR codes de chaque fichier dans une archive "
+                                  "<dossier>/<nom du fichier>.<format>")
+    single_file.add_argument("--sheets", action="store_true",
+                             help="planches d'étiquettes PDF <dossier>/<nom du fichier>.pdf "
+                                  "au lieu de fichiers séparés")
+    single_file.add_argument("--sprite", action="store_true",
+                             help="un seul SVG <dossier>/<nom du fichier>.svg (un symbole par contact) "
+                                  "et son index <nom du fichier>.json")
+    parser.add_argument("--store", action="store_true",
+                        help="archive ZIP sans compression")
+    parser.add_argument("--shard", metavar="SCHEMA[:N]",
+                        help="répartir les fichiers en sous-dossiers : hash[:N] (N sous-dossiers, "
+                             "défaut 256) ou prefix[:N] (N premières lettres du nom, défaut 1) ; "
+                             "l'index qr_index.csv donne le fichier de chaque contact")
+    parser.add_argument("--grid", metavar="COLONNESxLIGNES",
+                        default=f"{DEFAULT_SHEET_LAYOUT.columns}x{DEFAULT_SHEET_LAYOUT.rows}",
+                        help="planches : étiquettes par page (défaut : %(default)s)")
+    parser.add_argument("--page", choices=tuple(PAGE_SIZES), default=DEFAULT_SHEET_LAYOUT.page_size,
+                        help="planches : format de page (défaut : %(default)s)")
+    parser.add_argument("--margin", type=float, metavar="MM", default=DEFAULT_SHEET_LAYOUT.margin,
+                        help="planches : marge de la page en millimètres (défaut : %(default)s)")
+    parser.add_argument("--no-caption", action="store_true",
+                        help="planches : pas de légende prénom / nom sous les QR codes")
+    parser.add_argument("-j", "--workers", type=int, metavar="N",
+                        help="processus de génération (défaut : tous les cœurs)")
+    parser.add_argument("--cache-dir", metavar="DOSSIER",
+                        help="dossier du cache de rendu (défaut : qr_cache)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="désactiver le cache de rendu")
+    parser.add_argument("--no-incremental", action="store_true",
+                        help="régénérer toutes les lignes, même inchangées")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-v", "--verbose", action="store_true",
+                           help="afficher une ligne par QR code généré")
+    verbosity.add_argument("-q", "--quiet", action="store_true",
+                           help="n'afficher que les erreurs")
+    parser.add_argument("--progress", choices=("text", "json"),
+                        help="suivi de la progression : texte sur la sortie d'erreur, "
+                             "ou une ligne JSON par événement sur la sortie standard")
+    parser.add_argument("--timings", action="store_true",
+                        help="afficher le chronométrage par étape de chaque fichier")
+    parser.add_argument("--timings-json", metavar="FICHIER",
+                        help="écrire le chronométrage par étape (JSON) dans ce fichier")
+    return parser
+
+
+def _cli_output_paths(inputs, output_dir, archive_format):
+    """
+    Dossier (ou archive) de sortie de chaque fichier d'entrée.
+    Avec plusieurs fichiers, chacun a son propre sous-dossier ou sa propre archive.
+    archive_format : extension du fichier unique produit par entrée (archive ou PDF), ou None
+    """
+    paths = []
+    used = set()
+    for input_path in inputs:
+        name = Path(input_path).stem
+        # Deux fichiers de même nom dans des dossiers différents
+        unique = name
+        suffix = 2
+        while unique in used:
+            unique = f"{name}_{suffix}"
+            suffix += 1
+        used.add(unique)
+        
+        if archive_format is not None:
+            paths.append(output_dir / f"{unique}.{archive_format}")
+        elif len(inputs) > 1:
+            paths.append(output_dir / unique)
+        else:
+            paths.append(output_dir)
+    return paths
+
+
+def _cli_sink(args, target, stdout, sheet_layout, shard_layout):
+    """
+    Sortie d'un fichier d'entrée d'après les options de la ligne de commande
+    (target : dossier, archive ou document, « - » pour la sortie standard)
+    """
+    if target == "-":
+        return StreamSink(stdout.buffer, compress=args.archive == "tar.gz")
+    if args.sheets:
+        return PdfLabelWriter(target, sheet_layout)
+    if args.sprite:
+        return SvgSpriteWriter(target, border=QR_BORDER)
+    if args.archive is not None:
+        return ArchiveWriter(target, compress=not args.store)
+    return DirectorySink(target, shard_layout)
+
+
+class _CliProgress:
+    """
+    Suivi de progression pour process_excel_file : messages espacés d'au moins
+    CLI_PROGRESS_INTERVAL, le dernier état étant toujours affiché par finish()
+    """
+
+    def __init__(self, mode, input_path, stream):
+        self.mode = mode
+        self.input_path = str(input_path)
+        self.stream = stream
+        self.done = 0
+        self.total = None
+        self._last = 0.0
+        self._reported = None
+
+    def __call__(self, done, total):
+        self.done = done
+        self.total = total
+        now = perf_counter()
+        if now - self._last >= CLI_PROGRESS_INTERVAL:
+            self._last = now
+            self._write()
+
+    def _write(self):
+        import json
+        
+        self._reported = self.done
+        if self.mode == "json":
+            self.stream.write(json.dumps({'event': 'progress', 'input': self.input_path,
+                                          'done': self.done, 'total': self.total}) + "\n")
+        else:
+            total = self.total if self.total is not None else '?'
+            self.stream.write(f"\r{self.input_path}: {self.done}/{total}")
+        self.stream.flush()
+
+    def finish(self):
+        if self._reported != self.done:
+            self._write()
+        if self.mode == "text":
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def run_cli(argv=None):
+    """
+    Point d'entrée en ligne de commande (sans interface graphique).
+    Renvoie le code de retour du processus.
+    """
+    import json
+    import contextlib
+    
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers doit être supérieur ou égal à 1")
+    if args.module_size is not None and args.module_size < 1:
+        parser.error("--module-size doit être supérieur ou égal à 1")
+    output_format = get_output_format(args.format, box_size=args.module_size, dpi=args.dpi)
+    
+    sheet_layout = None
+    if args.sheets:
+        try:
+            columns, rows = parse_grid(args.grid)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.margin < 0:
+            parser.error("--margin doit être positif")
+        sheet_layout = SheetLayout(columns, rows, args.page, args.margin, not args.no_caption)
+        try:
+            sheet_qr_side(sheet_layout)
+        except ValueError as e:
+            parser.error(str(e))
+    # Les planches et le sprite sont un fichier unique par entrée, comme les archives
+    if args.sheets:
+        single_file = "pdf"
+    elif args.sprite:
+        single_file = "svg"
+    else:
+        single_file = args.archive
+    
+    shard_layout = None
+    if args.shard:
+        if single_file is not None or args.output == "-":
+            parser.error("--shard ne s'applique qu'à un dossier de sortie")
+        try:
+            shard_layout = parse_shard_layout(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    inputs = args.inputs or ["contacts.xlsx"]
+    
+    # « -o - » : archive tar écrite en flux sur la sortie standard, messages sur la sortie d'erreur
+    to_stdout = args.output == "-"
+    if to_stdout:
+        if len(inputs) > 1:
+            parser.error("-o - n'accepte qu'un seul fichier d'entrée")
+        if args.sheets or args.sprite or args.archive == "zip":
+            parser.error("-o - produit une archive tar (seuls --archive tar et tar.gz sont acceptés)")
+        if args.progress == "json":
+            parser.error("-o - et --progress json utilisent tous deux la sortie standard")
+        targets = ["-"]
+    else:
+        output_dir = Path(args.output) if args.output else get_default_output_dir()
+        targets = _cli_output_paths(inputs, output_dir, single_file)
+    cache = None
+    if not args.no_cache:
+        cache = RenderCache(Path(args.cache_dir) if args.cache_dir else get_default_cache_dir())
+    
+    # La sortie standard est réservée aux événements JSON ; en mode silencieux, rien n'est affiché
+    stdout = sys.stdout
+    quiet_library = args.quiet or args.progress == "json"
+    
+    failures = 0
+    timings = {}
+    for input_path, target in zip(inputs, targets):
+        timer = None
+        if args.timings or args.timings_json:
+            from qr_timing import StageTimer
+            timer = StageTimer()
+        progress = None
+        if args.progress:
+            progress = _CliProgress(args.progress, input_path,
+                                    stdout if args.progress == "json" else sys.stderr)
+        
+        started = perf_counter()
+        try:
+            sink = _cli_sink(args, target, stdout, sheet_layout, shard_layout)
+        except (OSError, ValueError) as e:
+            print(f"Impossible de créer la sortie {target}: {e}", file=sys.stderr)
+            sink = None
+        try:
+            with contextlib.ExitStack() as stack:
+                # Messages de la bibliothèque (lignes ignorées, bilan...), sur la sortie
+                # d'erreur si la sortie standard reçoit l'archive
+                if not quiet_library:
+                    handler = logging.StreamHandler(sys.stderr if to_stdout else sys.stdout)
+                    logger.addHandler(handler)
+                    stack.callback(logger.removeHandler, handler)
+                    stack.callback(logger.setLevel, logger.level)
+                    logger.setLevel(logging.INFO)
+                ok = False
+                if sink is not None:
+                    ok = process_excel_file(
+                        input_path,
+                        workers=args.workers,
+                        cache=cache,
+                        incremental=not args.no_incremental and single_file is None and not to_stdout,
+                        timer=timer,
+                        progress=progress,
+                        verbose=args.verbose,
+                        output_format=output_format,
+                        sink=sink,
+                    )
+        except KeyboardInterrupt:
+            print("\nInterrompu", file=sys.stderr)
+            return EXIT_INTERRUPTED
+        elapsed = perf_counter() - started
+        
+        if progress is not None:
+            progress.finish()
+        if not ok:
+            failures += 1
+            if not args.quiet:
+                print(f"Échec du traitement de {input_path}", file=sys.stderr)
+        if timer is not None:
+            timings[str(input_path)] = timer.summary()
+        if args.progress == "json":
+            stdout.write(json.dumps({'event': 'done', 'input': str(input_path), 'ok': ok,
+                                     'output': str(target), 'seconds': round(elapsed, 3)}) + "\n")
+            stdout.flush()
+    
+    if args.timings_json:
+        with open(args.timings_json, 'w', encoding='utf-8') as f:
+            json.dump(timings, f, ensure_ascii=False, indent=2)
+    
+    return EXIT_FAILURE if failures else EXIT_OK
+
+
+def main(argv=None):
+    """
+    Fonction principale
+    """
+    return run_cli(argv)
 
 
 if __name__ == "__main__":
-    main()
+    # Nécessaire pour le pool de processus dans l'exécutable PyInstaller
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Manifeste du dossier de sortie pour la régénération incrémentale.
+
+Le manifeste associe, pour chaque source des fiches (le fichier de contacts),
+l'identité de chaque ligne (le nom de son fichier) à l'empreinte de son
+contenu et au chemin du fichier produit (SVG ou PNG). Lors d'une nouvelle
+exécution, seules les lignes nouvelles ou modifiées sont régénérées, les
+fichiers des lignes supprimées sont effacés et les autres restent intacts.
+
+Plusieurs fichiers de contacts peuvent partager le même dossier de sortie :
+les entrées sont rangées par source, seuls les fichiers obsolètes de la
+source traitée sont effacés, et un fichier qui appartient déjà à une autre
+source n'est jamais réécrit (voir owner et tag : la ligne reçoit alors un
+nom propre à sa source).
+"""
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+
+# Nom du fichier manifeste dans le dossier de sortie
+MANIFEST_FILENAME = "qr_manifest.json"
+
+# Version du format du manifeste
+MANIFEST_VERSION = 3
+
+
+def source_key(source):
+    """
+    Clé d'une source dans le manifeste (les fiches sans fichier d'origine partagent la clé "")
+    """
+    return "" if source is None else str(source)
+
+
+class OutputManifest:
+    """
+    Manifeste source -> identité de ligne -> (empreinte du contenu, chemin du fichier)
+
+    source : identifiant de la source des fiches traitées (chemin du fichier de
+    contacts), None pour des fiches sans fichier d'origine
+    """
+
+    def __init__(self, output_dir, source=None):
+        self.output_dir = Path(output_dir)
+        self.source = source
+        self.path = self.output_dir / MANIFEST_FILENAME
+        # Entrées de la source traitée (exécution précédente, exécution courante)
+        self.previous = {}
+        self.entries = {}
+        # Entrées des autres sources, et chemin -> source propriétaire
+        self.others = {}
+        self._owners = {}
+        self.load()
+
+    @property
+    def tag(self):
+        """
+        Étiquette courte de la source, ajoutée aux noms de fichier déjà pris par une autre source
+        """
+        return hashlib.sha1(source_key(self.source).encode('utf-8')).hexdigest()[:8]
+
+    def load(self):
+        """
+        Charge le manifeste de l'exécution précédente s'il existe
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return
+        if content.get('version') != MANIFEST_VERSION:
+            return
+        sources = content.get('sources', {})
+        self.previous = sources.pop(source_key(self.source), {})
+        self.others = sources
+        self._owners = {entry['path']: name for name, entries in sources.items()
+                        for entry in entries.values()}
+
+    def owner(self, relative_path):
+        """
+        Autre source à laquelle appartient déjà ce fichier, None s'il est libre
+        (ou s'il appartient à la source traitée)
+        """
+        return self._owners.get(str(relative_path))
+
+    def is_unchanged(self, identity, content_hash, relative_path=None):
+        """
+        Vérifie si la ligne est identique à l'exécution précédente et que son fichier existe toujours
+        (au même chemin, si relative_path est fourni : format ou répartition changés)
+        """
+        entry = self.previous.get(identity)
+        if entry is None or entry.get('hash') != content_hash:
+            return False
+        if relative_path is not None and entry['path'] != str(relative_path):
+            return False
+        return (self.output_dir / entry['path']).is_file()
+
+    def record(self, identity, content_hash, relative_path):
+        """
+        Enregistre une ligne de l'exécution courante
+        """
+        self.entries[identity] = {'hash': content_hash, 'path': str(relative_path)}
+
+    def remove_stale_files(self):
+        """
+        Supprime les fichiers des lignes de la même source disparues depuis l'exécution
+        précédente, ainsi que les anciens fichiers des lignes dont le chemin a changé
+        (autre format ou autre répartition en sous-dossiers).
+        Les fichiers des autres sources ne sont jamais supprimés.
+        Renvoie le nombre de fichiers supprimés.
+        """
+        current_paths = {entry['path'] for entry in self.entries.values()}
+        current_paths.update(self._owners)
+        removed = 0
+        for entry in self.previous.values():
+            if entry['path'] in current_paths:
+                continue
+            filepath = self.output_dir / entry['path']
+            try:
+                os.remove(filepath)
+                removed += 1
+            except OSError:
+                continue
+            # Sous-dossier de répartition devenu vide
+            if filepath.parent != self.output_dir:
+                try:
+                    os.rmdir(filepath.parent)
+                except OSError:
+                    pass
+        return removed
+
+    def save(self, keep_previous=False):
+        """
+        Écrit le manifeste de l'exécution courante (écriture atomique)
+        
+        Les entrées des autres sources sont toujours conservées.
+        
+        keep_previous : conserve aussi les lignes de la même source non vues
+            cette fois-ci (exécution interrompue avant la fin)
+        """
+        self.output_dir.mkdir(exist_ok=True, parents=True)
+        if keep_previous:
+            self.entries = {**self.previous, **self.entries}
+        sources = dict(self.others)
+        if self.entries:
+            sources[source_key(self.source)] = self.entries
+        content = {'version': MANIFEST_VERSION, 'sources': sources}
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(content, f, ensure_ascii=False, indent=1, sort_keys=True)
+        # mkstemp crée un fichier privé : lui redonner les droits habituels
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, self.path)
+        self.previous = dict(self.entries)
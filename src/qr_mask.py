@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sélection du masque QR par évaluation bit à bit des pénalités.
+
+Au lieu de placer les données 8 fois et de parcourir la matrice module par
+module pour chacune des 4 règles de pénalité ISO, la matrice est placée une
+seule fois puis représentée par un entier unique (bit r * n + c = module
+(r, c)). Les 8 variantes masquées s'obtiennent par XOR, et les règles sont
+évaluées sur toutes les lignes et colonnes à la fois par décalages et
+opérations logiques. Le masque retenu est identique à celui de
+qrcode.util.lost_point (même barème, même départage en faveur du plus petit
+numéro de masque).
+"""
+import qrcode
+from qrcode import util
+
+# Motif 1:1:3:1:1 précédé ou suivi de 4 modules clairs (règle 3), offset 0 en premier
+FINDER_LIKE_PATTERNS = (
+    (1, 0, 1, 1, 1, 0, 1, 0, 0, 0, 0),
+    (0, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1),
+)
+
+# Masques précalculés par version : (masque des modules de données, [motifs de masque])
+_version_masks = {}
+
+# Masques de positions valides précalculés par taille de matrice
+_layout_masks = {}
+
+
+def pack_modules(modules):
+    """
+    Convertit une matrice de modules en entier (bit r * n + c = module (r, c))
+    """
+    bits = b''.join(bytes(reversed(row)) for row in reversed(modules))
+    return int(bits.translate(_BIT_CHARS), 2)
+
+
+_BIT_CHARS = bytes.maketrans(b'\x00\x01', b'01')
+
+
+def _get_layout_masks(n):
+    """
+    Masques des positions de départ valides, pour une matrice n x n :
+    fenêtres horizontales (colonne c <= n - k) et verticales (ligne r <= n - k)
+    """
+    masks = _layout_masks.get(n)
+    if masks is not None:
+        return masks
+
+    def columns_up_to(last_col):
+        row_bits = (1 << (last_col + 1)) - 1
+        value = 0
+        for r in range(n):
+            value |= row_bits << (r * n)
+        return value
+
+    def rows_up_to(last_row):
+        return (1 << ((last_row + 1) * n)) - 1
+
+    masks = {
+        'full': (1 << (n * n)) - 1,
+        'h2': columns_up_to(n - 2),
+        'h5': columns_up_to(n - 5),
+        'h11': columns_up_to(n - 11),
+        'v2': rows_up_to(n - 2),
+        'v5': rows_up_to(n - 5),
+        'v11': rows_up_to(n - 11),
+    }
+    _layout_masks[n] = masks
+    return masks
+
+
+def _get_version_masks(qr):
+    """
+    Masque des modules de données et motifs des 8 masques pour la version de qr
+    """
+    masks = _version_masks.get(qr.version)
+    if masks is not None:
+        return masks
+
+    n = qr.version * 4 + 17
+
+    # Reconstituer les motifs fixes (sans données) pour repérer les modules de données
+    saved_modules = qr.modules
+    qr.modules_count = n
+    qr.modules = [[None] * n for _ in range(n)]
+    qr.setup_position_probe_pattern(0, 0)
+    qr.setup_position_probe_pattern(n - 7, 0)
+    qr.setup_position_probe_pattern(0, n - 7)
+    qr.setup_position_adjust_pattern()
+    qr.setup_timing_pattern()
+    qr.setup_type_info(True, 0)
+    if qr.version >= 7:
+        qr.setup_type_number(True)
+    data_modules = pack_modules([[module is None for module in row] for row in qr.modules])
+    qr.modules = saved_modules
+
+    patterns = []
+    for mask_pattern in range(8):
+        mask_func = util.mask_func(mask_pattern)
+        patterns.append(pack_modules([[bool(mask_func(r, c)) for c in range(n)] for r in range(n)]) & data_modules)
+
+    masks = (data_modules, patterns)
+    _version_masks[qr.version] = masks
+    return masks
+
+
+def _run_penalty(same, step, valid_pairs, valid_runs):
+    """
+    Règle 1 dans une direction : chaque suite de L >= 5 modules identiques coûte L - 2.
+    same : bits où le module est identique à son voisin (à la distance step)
+    """
+    same &= valid_pairs
+    windows = same & (same >> step) & (same >> (2 * step)) & (same >> (3 * step)) & valid_runs
+    # L - 2 = (nombre de fenêtres de 5 dans la suite) + 2 par suite
+    run_starts = windows & ~(windows << step)
+    return windows.bit_count() + 2 * run_starts.bit_count()
+
+
+def _finder_penalty(matrix, inverse, step, valid_starts):
+    """
+    Règle 3 dans une direction : 40 points par motif 1:1:3:1:1 bordé de 4 modules clairs
+    """
+    count = 0
+    for pattern in FINDER_LIKE_PATTERNS:
+        found = valid_starts
+        for offset, is_dark in enumerate(pattern):
+            found &= (matrix if is_dark else inverse) >> (offset * step)
+            if not found:
+                break
+        count += found.bit_count()
+    return count * 40
+
+
+def lost_point(matrix, n):
+    """
+    Pénalité totale d'une matrice empaquetée, identique à qrcode.util.lost_point
+    """
+    masks = _get_layout_masks(n)
+    inverse = matrix ^ masks['full']
+
+    # Règle 1 : suites de modules identiques, en ligne puis en colonne
+    same_h = ~(matrix ^ (matrix >> 1))
+    same_v = ~(matrix ^ (matrix >> n))
+    lost = _run_penalty(same_h, 1, masks['h2'], masks['h5'])
+    lost += _run_penalty(same_v, n, masks['v2'], masks['v5'])
+
+    # Règle 2 : blocs 2x2 de même couleur
+    blocks = same_v & (same_v >> 1) & same_h & masks['h2'] & masks['v2']
+    lost += 3 * blocks.bit_count()
+
+    # Règle 3 : motifs ressemblant aux repères de position
+    lost += _finder_penalty(matrix, inverse, 1, masks['h11'])
+    lost += _finder_penalty(matrix, inverse, n, masks['v11'])
+
+    # Règle 4 : proportion de modules foncés (même calcul flottant que la référence)
+    percent = float(matrix.bit_count()) / (n ** 2)
+    rating = int(abs(percent * 100 - 50) / 5)
+    lost += rating * 10
+
+    return lost
+
+
+def best_mask_pattern(qr):
+    """
+    Trouve le meilleur masque pour qr en un seul placement des données
+    """
+    # Placement unique avec le masque 0, puis retrait du masque pour obtenir la matrice brute
+    qr.makeImpl(True, 0)
+    data_modules, patterns = _get_version_masks(qr)
+    unmasked = pack_modules(qr.modules) ^ patterns[0]
+
+    n = qr.modules_count
+    min_lost_point = 0
+    best = 0
+    for mask_pattern in range(8):
+        lost = lost_point(unmasked ^ patterns[mask_pattern], n)
+        if mask_pattern == 0 or min_lost_point > lost:
+            min_lost_point = lost
+            best = mask_pattern
+    return best
+
+
+class FastMaskQRCode(qrcode.QRCode):
+    """
+    QRCode dont la sélection du masque utilise l'évaluation bit à bit
+    """
+
+    def best_mask_pattern(self):
+        return best_mask_pattern(self)
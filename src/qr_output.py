@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Destinations des QR codes générés (« sorties »).
+
+Toutes les sorties dérivent de OutputSink et offrent la même interface :
+add(nom, octets) pour chaque QR code, describe() pour le résumé, discard()
+pour abandonner un lot annulé, close() (ou un bloc with, qui abandonne la
+sortie si une erreur l'interrompt) pour terminer. La destination est choisie
+et préparée une seule fois par lot :
+
+- DirectorySink : un fichier par QR code dans un dossier, éventuellement
+  réparti en sous-dossiers (voir ShardLayout) avec un index des fichiers
+- MemorySink : octets gardés en mémoire, sans toucher au disque
+- StreamSink : archive tar écrite en flux (sortie standard par exemple)
+- ArchiveWriter : archive unique ZIP ou tar ; chaque entrée est ajoutée dès
+  qu'elle est produite, la mémoire reste bornée à une entrée à la fois
+
+Les documents uniques (planches PDF de qr_pdf, sprite SVG de qr_sprite) sont
+aussi des sorties, qui reçoivent la matrice de modules de chaque QR code
+(voir OutputSink.wants_modules).
+"""
+import io
+import os
+import csv
+import time
+import hashlib
+import tarfile
+import tempfile
+import zipfile
+import unicodedata
+from collections import namedtuple
+from pathlib import Path
+
+# Répartition des fichiers d'un dossier en sous-dossiers :
+# - "hash" : size sous-dossiers, choisis par empreinte du nom (répartition uniforme)
+# - "prefix" : un sous-dossier par début de nom, sur size caractères (A, B, ... ou AB, AC, ...)
+ShardLayout = namedtuple('ShardLayout', 'scheme size')
+
+# Schémas de répartition et taille par défaut de chacun
+SHARD_SCHEMES = {'hash': 256, 'prefix': 1}
+
+# Index des fichiers d'un dossier réparti en sous-dossiers
+INDEX_FILENAME = "qr_index.csv"
+
+# Noms de périphériques réservés par Windows, avec ou sans extension (« CON », « nul.svg »)
+WINDOWS_RESERVED_NAMES = frozenset(
+    ['CON', 'PRN', 'AUX', 'NUL']
+    + [f"COM{digit}" for digit in range(1, 10)]
+    + [f"LPT{digit}" for digit in range(1, 10)]
+)
+
+
+def parse_shard_layout(text):
+    """
+    Convertit "hash", "hash:1024", "prefix" ou "prefix:2" en ShardLayout
+    """
+    scheme, _, size = text.partition(':')
+    if scheme not in SHARD_SCHEMES:
+        raise ValueError(f"Répartition inconnue: {scheme} (disponibles: {', '.join(SHARD_SCHEMES)})")
+    try:
+        size = int(size) if size else SHARD_SCHEMES[scheme]
+    except ValueError:
+        raise ValueError(f"Taille de répartition invalide: {text}")
+    if size < 1:
+        raise ValueError(f"Taille de répartition invalide: {text}")
+    return ShardLayout(scheme, size)
+
+
+def escape_reserved_name(name):
+    """
+    Ajoute « _ » à un nom de fichier ou de dossier réservé par Windows (« CON » -> « CON_ »,
+    « aux.svg » -> « aux_.svg »), les autres noms sont renvoyés tels quels
+    """
+    stem, dot, extension = name.partition('.')
+    if stem.rstrip(' ').upper() in WINDOWS_RESERVED_NAMES:
+        return f"{stem}_{dot}{extension}"
+    return name
+
+
+def shard_directory(name, layout):
+    """
+    Sous-dossier d'un fichier : stable d'une exécution à l'autre et d'une machine à l'autre
+    """
+    if layout.scheme == 'hash':
+        digest = hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest()
+        bucket = int.from_bytes(digest, 'big') % layout.size
+        return format(bucket, f"0{len(format(layout.size - 1, 'x'))}x")
+
+    # Début du nom sans accents ni casse : « Élodie » et « elodie » vont dans E
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    prefix = "".join(c for c in ascii_name.upper() if c.isalnum())[:layout.size]
+    return escape_reserved_name(prefix.ljust(layout.size, '_'))
+
+
+def _tar_entry(name, size):
+    """
+    En-tête tar d'une entrée (fichier ordinaire lisible par tous)
+    """
+    entry = tarfile.TarInfo(name)
+    entry.size = size
+    entry.mtime = int(time.time())
+    entry.mode = 0o644
+    return entry
+
+
+class OutputSink:
+    """
+    Base des sorties : bloc with et comportements par défaut.
+
+    wants_modules : la sortie reçoit add(nom, modules, légende), avec le nom de
+    fichier sans extension, la matrice de modules et le nom du contact (documents
+    uniques), au lieu de add(nom de fichier, octets du fichier rendu)
+    """
+
+    wants_modules = False
+
+    def discard(self):
+        """
+        Abandonne la sortie d'un lot annulé ou interrompu (rien à défaire par défaut)
+        """
+
+    def close(self):
+        """
+        Termine la sortie (rien à faire par défaut)
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Lot interrompu par une erreur : ne pas terminer une sortie incomplète
+        if exc_type is not None:
+            self.discard()
+        self.close()
+
+
+class DirectorySink(OutputSink):
+    """
+    Dossier de sortie : un fichier par QR code.
+
+    shard_layout : ShardLayout optionnel, pour répartir les fichiers en sous-dossiers
+    (un dossier de 100 000 fichiers ralentit l'explorateur et chaque nouvelle création).
+
+    Le dossier est créé une seule fois, à la construction, et chaque sous-dossier
+    au premier fichier qu'il reçoit. La sortie ne garde que des chemins : elle peut
+    être transmise aux processus de travail, qui écrivent alors les fichiers eux-mêmes.
+    Les fichiers déjà écrits sont complets : un lot abandonné les conserve.
+    """
+
+    def __init__(self, path, shard_layout=None):
+        self.path = Path(path)
+        self.shard_layout = shard_layout
+        self.count = 0
+        self._created = set()
+        self.path.mkdir(exist_ok=True, parents=True)
+
+    def relative_path(self, name):
+        """
+        Chemin d'un fichier relatif au dossier (séparateur « / »)
+        """
+        if self.shard_layout is None:
+            return name
+        return f"{shard_directory(name, self.shard_layout)}/{name}"
+
+    def add(self, name, data):
+        """
+        Écrit un fichier (nom dans le dossier, octets) et renvoie son chemin
+        """
+        filepath = self.path / self.relative_path(name)
+        if self.shard_layout is not None and filepath.parent not in self._created:
+            filepath.parent.mkdir(exist_ok=True)
+            self._created.add(filepath.parent)
+        with open(filepath, 'wb') as f:
+            f.write(data)
+        self.count += 1
+        return filepath
+
+    def describe(self):
+        return f"{self.count} QR code(s) écrit(s) dans le dossier: {self.path}"
+
+
+class OutputIndex:
+    """
+    Index contact -> chemin du fichier d'un dossier réparti en sous-dossiers
+    (CSV séparé par « ; », lisible par Excel).
+
+    Les lignes sont écrites au fil de l'eau dans un fichier temporaire, mis en
+    place par commit() en fin de lot ; un lot annulé garde l'index précédent.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / INDEX_FILENAME
+        fd, self._tmp_path = tempfile.mkstemp(dir=self.output_dir, suffix='.tmp')
+        self._file = os.fdopen(fd, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._file, delimiter=';')
+        self._writer.writerow(['contact', 'fichier'])
+
+    def add(self, contact, relative_path):
+        self._writer.writerow([contact, relative_path])
+
+    def commit(self):
+        """
+        Met l'index en place (écriture atomique)
+        """
+        self._file.close()
+        # mkstemp crée un fichier privé : lui redonner les droits habituels
+        os.chmod(self._tmp_path, 0o644)
+        os.replace(self._tmp_path, self.path)
+
+    def discard(self):
+        """
+        Abandonne l'index en cours, l'index précédent reste en place
+        """
+        self._file.close()
+        os.remove(self._tmp_path)
+
+
+def remove_index(output_dir):
+    """
+    Supprime l'index laissé par une exécution précédente répartie en sous-dossiers
+    """
+    try:
+        os.remove(Path(output_dir) / INDEX_FILENAME)
+    except FileNotFoundError:
+        pass
+
+
+class MemorySink(OutputSink):
+    """
+    Sortie en mémoire : files associe chaque nom de fichier à ses octets, dans l'ordre
+    """
+
+    def __init__(self):
+        self.files = {}
+
+    @property
+    def count(self):
+        return len(self.files)
+
+    def add(self, name, data):
+        self.files[name] = data
+
+    def describe(self):
+        return f"{self.count} QR code(s) gardé(s) en mémoire"
+
+    def discard(self):
+        self.files.clear()
+
+
+class StreamSink(OutputSink):
+    """
+    Archive tar écrite en flux sur un flux binaire (par exemple sys.stdout.buffer),
+    lisible au fil de l'eau par « tar x ».
+
+    compress : archive compressée (gzip)
+    Le flux n'est pas fermé par close().
+    """
+
+    def __init__(self, stream, compress=False):
+        self.stream = stream
+        self.count = 0
+        self._archive = tarfile.open(fileobj=stream, mode='w|gz' if compress else 'w|')
+
+    def add(self, name, data):
+        self._archive.addfile(_tar_entry(name, len(data)), io.BytesIO(data))
+        self.count += 1
+
+    def describe(self):
+        return f"{self.count} QR code(s) écrit(s) dans le flux de sortie"
+
+    def discard(self):
+        # Les entrées déjà envoyées ne peuvent pas être reprises : terminer l'archive
+        self.close()
+
+    def close(self):
+        if self._archive.closed:
+            return
+        self._archive.close()
+        self.stream.flush()
+
+
+def get_archive_kind(path):
+    """
+    Type d'archive d'après l'extension : "zip", "tar" ou "tar.gz"
+    """
+    name = Path(path).name.lower()
+    if name.endswith('.zip'):
+        return 'zip'
+    if name.endswith('.tar.gz') or name.endswith('.tgz'):
+        return 'tar.gz'
+    if name.endswith('.tar'):
+        return 'tar'
+    raise ValueError(f"Format d'archive non reconnu (zip, tar ou tar.gz attendu): {path}")
+
+
+class ArchiveWriter(OutputSink):
+    """
+    Archive ZIP ou tar alimentée entrée par entrée.
+
+    compress : pour une archive ZIP, entrées compressées (deflate) ou stockées telles quelles.
+    Pour tar, la compression est déterminée par l'extension (.tar.gz / .tgz).
+    """
+
+    def __init__(self, path, compress=True):
+        self.path = Path(path)
+        self.kind = get_archive_kind(path)
+        self.count = 0
+
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        if self.kind == 'zip':
+            compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            self._archive = zipfile.ZipFile(self.path, 'w', compression=compression)
+        elif self.kind == 'tar.gz':
+            self._archive = tarfile.open(self.path, 'w:gz')
+        else:
+            self._archive = tarfile.open(self.path, 'w')
+
+    def add(self, name, data):
+        """
+        Ajoute une entrée (nom dans l'archive, octets)
+        """
+        if self.kind == 'zip':
+            entry = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            entry.compress_type = self._archive.compression
+            entry.external_attr = 0o644 << 16
+            self._archive.writestr(entry, data)
+        else:
+            self._archive.addfile(_tar_entry(name, len(data)), io.BytesIO(data))
+        self.count += 1
+
+    def describe(self):
+        return f"{self.count} QR code(s) écrit(s) dans l'archive: {self.path}"
+
+    def discard(self):
+        """
+        Abandonne l'archive : ferme et supprime le fichier incomplet
+        """
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def close(self):
+        self._archive.close()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Planches d'étiquettes PDF (plusieurs QR codes par page).
+
+Les QR codes sont dessinés en tracés vectoriels (un rectangle par suite de
+modules noirs) directement depuis la matrice de modules, avec une légende
+facultative (prénom et nom). Chaque page est écrite dans le fichier dès
+qu'elle est pleine : la mémoire reste constante quel que soit le nombre
+de contacts, seule la table des positions des objets grandit.
+"""
+import zlib
+from collections import namedtuple
+from pathlib import Path
+
+from qr_output import OutputSink
+
+# Formats de page (points PDF, 1 pt = 1/72 pouce)
+PAGE_SIZES = {
+    'a4': (595.28, 841.89),
+    'letter': (612.0, 792.0),
+}
+
+# Millimètres -> points
+MM = 72 / 25.4
+
+# Disposition d'une planche : grille, format de page, marge (mm), légende
+SheetLayout = namedtuple('SheetLayout', 'columns rows page_size margin caption')
+
+# Disposition par défaut : 3 x 7 étiquettes sur A4
+DEFAULT_SHEET_LAYOUT = SheetLayout(columns=3, rows=7, page_size='a4', margin=10, caption=True)
+
+# Légende : taille de police (pt), espace réservé sous le QR code (pt)
+CAPTION_FONT_SIZE = 9
+CAPTION_HEIGHT = 14
+
+# Bordure (en modules) autour de chaque QR code
+SHEET_QR_BORDER = 1
+
+# Côté minimal d'un QR code imprimé (mm) : en dessous, une vCard n'est plus lisible au téléphone
+MIN_QR_SIDE = 10
+
+
+def parse_grid(grid):
+    """
+    Convertit une grille "COLONNESxLIGNES" (ex. "3x7") en (colonnes, lignes)
+    """
+    try:
+        columns, rows = (int(value) for value in grid.lower().split('x'))
+    except ValueError:
+        raise ValueError(f"Grille invalide (COLONNESxLIGNES attendu, ex. 3x7): {grid}")
+    if columns < 1 or rows < 1:
+        raise ValueError(f"Grille invalide: {grid}")
+    return columns, rows
+
+
+def sheet_qr_side(layout):
+    """
+    Côté (points) des QR codes d'une planche : la cellule, moins la légende, avec un peu d'air.
+    Lève ValueError si la cellule est trop petite pour un QR code lisible et sa légende.
+    """
+    page_width, page_height = PAGE_SIZES[layout.page_size]
+    margin = layout.margin * MM
+    cell_width = (page_width - 2 * margin) / layout.columns
+    cell_height = (page_height - 2 * margin) / layout.rows
+    caption_height = CAPTION_HEIGHT if layout.caption else 0
+    side = min(cell_width, cell_height - caption_height) * 0.9
+    if side < MIN_QR_SIDE * MM:
+        raise ValueError(f"Grille {layout.columns}x{layout.rows} trop dense pour le format "
+                         f"{layout.page_size} : QR codes de moins de {MIN_QR_SIDE} mm")
+    return side
+
+
+def _pdf_text(text):
+    """
+    Chaîne PDF littérale (encodage WinAnsi, caractères spéciaux échappés)
+    """
+    data = text.encode('cp1252', errors='replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def modules_to_pdf_path(modules, border):
+    """
+    Opérateurs de tracé PDF des modules noirs, en unités de module
+    (origine en bas à gauche, bordure comprise) : un rectangle par suite
+    horizontale de modules noirs
+    """
+    modules_count = len(modules)
+    parts = []
+    for r, row in enumerate(modules):
+        y = modules_count - 1 - r + border
+        c = 0
+        while c < modules_count:
+            if row[c]:
+                start = c
+                while c < modules_count and row[c]:
+                    c += 1
+                parts.append(f"{start + border} {y} {c - start} 1 re\n")
+            else:
+                c += 1
+    parts.append("f\n")
+    return "".join(parts)
+
+
+class PdfLabelWriter(OutputSink):
+    """
+    Document PDF de planches d'étiquettes alimenté QR code par QR code.
+
+    layout : SheetLayout (grille, format de page, marge, légende)
+    """
+
+    wants_modules = True
+
+    def __init__(self, path, layout=DEFAULT_SHEET_LAYOUT):
+        self.path = Path(path)
+        self.layout = layout
+        self.count = 0
+        # Vérifié avant de créer le fichier
+        self.qr_side = sheet_qr_side(layout)
+        self.page_width, self.page_height = PAGE_SIZES[layout.page_size]
+
+        # Dimensions d'une cellule de la grille
+        margin = layout.margin * MM
+        self.cell_width = (self.page_width - 2 * margin) / layout.columns
+        self.cell_height = (self.page_height - 2 * margin) / layout.rows
+        self.origin_x = margin
+        self.origin_y = self.page_height - margin
+
+        self._offsets = {}
+        self._page_ids = []
+        self._next_id = 4  # 1 : catalogue, 2 : arbre des pages, 3 : police
+        self._cells = []
+
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self._file = open(self.path, 'wb')
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        self._write_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                              b"/Encoding /WinAnsiEncoding >>")
+
+    @property
+    def page_count(self):
+        """
+        Nombre de pages écrites (ou commencées)
+        """
+        return len(self._page_ids) + (1 if self._cells else 0)
+
+    def _write_object(self, object_id, body):
+        self._offsets[object_id] = self._file.tell()
+        self._file.write(f"{object_id} 0 obj\n".encode('ascii') + body + b"\nendobj\n")
+
+    def _new_id(self):
+        object_id = self._next_id
+        self._next_id += 1
+        return object_id
+
+    def add(self, name, modules, caption=''):
+        """
+        Ajoute un QR code (matrice de modules) et sa légende à la page courante.
+        name (nom de fichier du QR code) n'apparaît pas sur les planches.
+        """
+        slot = len(self._cells)
+        column = slot % self.layout.columns
+        row = slot // self.layout.columns
+
+        caption_height = CAPTION_HEIGHT if self.layout.caption else 0
+        side = self.qr_side
+        modules_total = len(modules) + 2 * SHEET_QR_BORDER
+        scale = side / modules_total
+
+        cell_x = self.origin_x + column * self.cell_width
+        cell_top = self.origin_y - row * self.cell_height
+        x = cell_x + (self.cell_width - side) / 2
+        y = cell_top - (self.cell_height - caption_height - side) / 2 - side
+
+        content = [f"q {scale:.4f} 0 0 {scale:.4f} {x:.2f} {y:.2f} cm 0 g\n",
+                   modules_to_pdf_path(modules, SHEET_QR_BORDER), "Q\n"]
+        cell = "".join(content).encode('ascii')
+
+        if self.layout.caption and caption:
+            # Police à chasse variable sans métriques : largeur moyenne estimée pour tronquer
+            max_chars = max(1, int(side / (CAPTION_FONT_SIZE * 0.5)))
+            if len(caption) > max_chars:
+                caption = caption[:max_chars - 1] + "…"
+            cell += (f"BT /F1 {CAPTION_FONT_SIZE} Tf {x + scale * SHEET_QR_BORDER:.2f} "
+                     f"{y - CAPTION_FONT_SIZE:.2f} Td (").encode('ascii')
+            cell += _pdf_text(caption) + b") Tj ET\n"
+
+        self._cells.append(cell)
+        self.count += 1
+        if len(self._cells) >= self.layout.columns * self.layout.rows:
+            self._flush_page()
+
+    def _flush_page(self):
+        """
+        Écrit la page courante (contenu compressé puis objet page) et libère sa mémoire
+        """
+        if not self._cells:
+            return
+        stream = zlib.compress(b"".join(self._cells), 6)
+        self._cells = []
+
+        content_id = self._new_id()
+        self._write_object(content_id, f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n"
+                                       .encode('ascii') + stream + b"\nendstream")
+        page_id = self._new_id()
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.page_width} {self.page_height}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode('ascii'))
+        self._page_ids.append(page_id)
+
+    def describe(self):
+        """
+        Résumé du document produit
+        """
+        return f"{self.count} QR code(s) placé(s) sur {self.page_count} page(s): {self.path}"
+
+    def discard(self):
+        """
+        Abandonne le document : ferme et supprime le fichier
+        """
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+    def close(self):
+        """
+        Termine le document : dernière page, arbre des pages, table des objets
+        """
+        if self._file.closed:
+            return
+        self._flush_page()
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>"
+                              .encode('ascii'))
+
+        xref_offset = self._file.tell()
+        lines = [f"xref\n0 {self._next_id}\n", "0000000000 65535 f \n"]
+        for object_id in range(1, self._next_id):
+            lines.append(f"{self._offsets[object_id]:010d} 00000 n \n")
+        lines.append(f"trailer\n<< /Size {self._next_id} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self._file.write("".join(lines).encode('ascii'))
+        self._file.close()
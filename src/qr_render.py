@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rendu direct des QR codes à partir de la matrice de modules.
+
+Le SVG est construit en mémoire en une seule passe, sans passer par
+ElementTree ni par un fichier intermédiaire. La sortie est identique,
+octet pour octet, à celle de qrcode.image.svg.SvgPathImage.
+
+L'aperçu de l'interface est lui aussi construit directement : une image
+1 bit d'un pixel par module, agrandie au plus proche voisin à la taille
+d'affichage. Les PNG du traitement en lot sont écrits de la même façon,
+en niveaux de gris 1 bit, sans passer par PIL.
+
+L'encodeur (qrcode) et PIL ne sont importés qu'au premier usage, pour que
+l'interface puisse s'afficher sans les charger.
+"""
+import zlib
+import struct
+from decimal import Decimal
+
+# Style du chemin, identique à SvgPathImage.QR_PATH_STYLE
+SVG_PATH_STYLE = 'fill="#000000" fill-opacity="1" fill-rule="nonzero" stroke="none"'
+
+# Signature d'un fichier PNG
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Réglages zlib des PNG. Les lignes de pixels se répètent box_size fois :
+# le niveau 6 les compresse presque aussi bien que le niveau 9 (+1 à 2 %)
+# pour un temps de compression divisé par huit, le niveau 9 parcourant
+# inutilement de longues chaînes de correspondances identiques.
+PNG_ZLIB_LEVEL = 6
+PNG_ZLIB_MEMLEVEL = 9
+
+
+def encode_modules(data, version, error_correction):
+    """
+    Encode les données et renvoie la matrice de modules (sans bordure).
+    Le masque est choisi par l'évaluation bit à bit de qr_mask.
+    """
+    from qr_mask import FastMaskQRCode
+    
+    qr = FastMaskQRCode(
+        version=version,
+        error_correction=error_correction,
+        border=0,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.modules
+
+
+def _svg_units(pixels):
+    """
+    Convertit des pixels en unités SVG (10 pixels = 1mm), comme SvgFragmentImage.units
+    """
+    return str(Decimal(pixels) / 10)
+
+
+def modules_to_svg(modules, box_size, border):
+    """
+    Construit le document SVG (octets UTF-8) d'une matrice de modules
+    """
+    modules_count = len(modules)
+    dimension = _svg_units((modules_count + border * 2) * box_size)
+
+    # Coordonnées de chaque bord de module, calculées une seule fois
+    coords = [_svg_units((i + border) * box_size) for i in range(modules_count + 1)]
+
+    subpaths = []
+    for r, row in enumerate(modules):
+        y0 = coords[r]
+        y1 = coords[r + 1]
+        for c, is_dark in enumerate(row):
+            if is_dark:
+                x0 = coords[c]
+                subpaths.append(f"M{x0},{y0}H{coords[c + 1]}V{y1}H{x0}z")
+
+    svg = (
+        "<?xml version='1.0' encoding='UTF-8'?>\n"
+        f'<svg width="{dimension}mm" height="{dimension}mm" version="1.1" '
+        f'viewBox="0 0 {dimension} {dimension}" xmlns="http://www.w3.org/2000/svg">'
+        f'<path d="{"".join(subpaths)}" id="qr-path" {SVG_PATH_STYLE} /></svg>'
+    )
+    return svg.encode('utf-8')
+
+
+def modules_to_image(modules, size, border):
+    """
+    Construit l'image PIL 1 bit (size x size) d'une matrice de modules,
+    agrandie au plus proche voisin (les modules restent nets)
+    """
+    from PIL import Image
+    
+    modules_count = len(modules)
+    width = modules_count + border * 2
+    
+    # Un octet par pixel (0 = noir, 255 = blanc), bordure comprise
+    blank_rows = b'\xff' * (width * border)
+    side = b'\xff' * border
+    pixels = bytearray(blank_rows)
+    for row in modules:
+        pixels += side
+        pixels += bytes(0 if is_dark else 255 for is_dark in row)
+        pixels += side
+    pixels += blank_rows
+    
+    image = Image.frombytes('L', (width, width), bytes(pixels)).convert('1', dither=Image.Dither.NONE)
+    return image.resize((size, size), Image.Resampling.NEAREST)
+
+
+def _png_chunk(chunk_type, data):
+    """
+    Bloc PNG : longueur, type, données et CRC
+    """
+    return (struct.pack('>I', len(data)) + chunk_type + data
+            + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+
+
+def modules_to_png(modules, box_size, border, dpi=None):
+    """
+    Construit le fichier PNG (octets) d'une matrice de modules : niveaux de
+    gris sur 1 bit, box_size pixels par module, résolution dpi indiquée dans
+    le bloc pHYs si fournie
+    """
+    modules_count = len(modules)
+    width = (modules_count + border * 2) * box_size
+    row_bytes = (width + 7) // 8
+    
+    # Bit à 1 = pixel blanc, bit à 0 = pixel noir ; octet 0 en tête de ligne (pas de filtre)
+    blank_line = b'\x00' + bytes([0xff]) * row_bytes
+    margin = border * box_size
+    padding = row_bytes * 8 - width
+    lines = [blank_line * margin]
+    for row in modules:
+        bits = 0
+        for is_dark in row:
+            bits = (bits << box_size) | (0 if is_dark else (1 << box_size) - 1)
+        # Bordures gauche et droite (blanches), puis complément à l'octet
+        bits = ((((1 << margin) - 1) << (modules_count * box_size + margin))
+                | (bits << margin) | ((1 << margin) - 1))
+        bits = (bits << padding) | ((1 << padding) - 1)
+        lines.append((b'\x00' + bits.to_bytes(row_bytes, 'big')) * box_size)
+    lines.append(blank_line * margin)
+    
+    compressor = zlib.compressobj(PNG_ZLIB_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS, PNG_ZLIB_MEMLEVEL)
+    image_data = compressor.compress(b''.join(lines)) + compressor.flush()
+    
+    # IHDR : largeur, hauteur, 1 bit, niveaux de gris, compression, filtre, pas d'entrelacement
+    chunks = [_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, width, 1, 0, 0, 0, 0))]
+    if dpi:
+        pixels_per_meter = round(dpi / 0.0254)
+        chunks.append(_png_chunk(b'pHYs', struct.pack('>IIB', pixels_per_meter, pixels_per_meter, 1)))
+    chunks.append(_png_chunk(b'IDAT', image_data))
+    chunks.append(_png_chunk(b'IEND', b''))
+    return PNG_SIGNATURE + b''.join(chunks)
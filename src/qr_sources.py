@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lecture en flux des fiches contact (Excel, CSV, TSV, JSON Lines).
+
+Les lecteurs renvoient les en-têtes du fichier et un générateur qui produit
+les fiches une par une (dictionnaire champ -> texte), sans jamais charger
+toute la feuille en mémoire : la génération peut démarrer dès la première
+ligne et la mémoire reste constante quelle que soit la taille du fichier.
+
+Chaque source tient à jour line_number, le numéro de ligne dans le fichier
+de la dernière fiche produite, pour les messages sur une ligne précise.
+"""
+import os
+import csv
+import json
+import codecs
+
+# Champs reconnus d'une fiche contact
+CONTACT_FIELDS = ('prenom', 'nom', 'profession', 'societe', 'mobile', 'pro', 'email', 'adresse', 'site_web')
+
+# Colonnes obligatoires
+REQUIRED_FIELDS = ('prenom', 'nom')
+
+# Clé facultative d'une fiche : sa position dans le fichier (à partir de 1, lignes vides
+# comprises), qui numérote son QR code quand des fiches ont été écartées avant le
+# traitement (lignes vides masquées par l'interface)
+RECORD_NUMBER_FIELD = 'numero_fiche'
+
+
+def cell_text(value):
+    """
+    Convertit la valeur brute d'une cellule en texte, chaîne vide si la cellule est vide
+    """
+    return str(value).strip() if value is not None else ''
+
+
+def map_headers(header_values):
+    """
+    Associe chaque en-tête (en minuscules) à l'index de sa colonne
+    """
+    headers = {}
+    for col_idx, value in enumerate(header_values):
+        if value:
+            headers[str(value).strip().lower()] = col_idx
+    return headers
+
+
+def row_to_contact(values, headers):
+    """
+    Construit une fiche contact à partir des valeurs d'une ligne
+    """
+    contact = {}
+    row_length = len(values)
+    for field in CONTACT_FIELDS:
+        col_idx = headers.get(field, -1)
+        contact[field] = cell_text(values[col_idx]) if 0 <= col_idx < row_length else ''
+    return contact
+
+
+class ExcelContactSource:
+    """
+    Source de fiches contact lue en flux depuis un fichier Excel (mode lecture seule d'openpyxl).
+
+    headers : en-têtes du fichier (nom en minuscules -> index de colonne)
+    row_count : nombre de lignes de données annoncé par le fichier, None s'il est inconnu
+    line_number : numéro de ligne (Excel) de la dernière fiche produite
+    L'itération produit une fiche par ligne de données, lignes vides comprises.
+    """
+
+    def __init__(self, path):
+        # openpyxl est long à importer : seulement à l'ouverture d'un fichier Excel
+        import openpyxl
+        
+        self.path = path
+        self.workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        sheet = self.workbook.active
+
+        self.row_count = sheet.max_row - 1 if sheet.max_row else None
+        self.line_number = 1
+        self._rows = sheet.iter_rows(values_only=True)
+        self.headers = map_headers(next(self._rows, None) or ())
+
+    def __iter__(self):
+        headers = self.headers
+        # La ligne 1 est l'en-tête
+        for self.line_number, values in enumerate(self._rows, start=2):
+            yield row_to_contact(values, headers)
+
+    def close(self):
+        self.workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _detect_text_encoding(path, chunk_size=1024 * 1024):
+    """
+    Détecte l'encodage d'un fichier texte : UTF-8 (avec ou sans BOM) si tout le
+    fichier est valide, sinon Windows-1252.
+    
+    Le fichier entier est vérifié, par blocs (mémoire constante) : un export
+    Windows-1252 dont le premier accent arrive loin dans le fichier n'est pas
+    pris pour de l'UTF-8.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        try:
+            while True:
+                chunk = f.read(chunk_size)
+                # Un caractère multi-octets peut être coupé entre deux blocs, pas en fin de fichier
+                decoder.decode(chunk, final=not chunk)
+                if not chunk:
+                    break
+        except UnicodeDecodeError:
+            return 'cp1252'
+    return 'utf-8-sig'
+
+
+class CsvContactSource:
+    """
+    Source de fiches contact lue en flux depuis un fichier CSV ou TSV.
+
+    Les en-têtes sont ceux de la première ligne, comme pour Excel. Sans
+    séparateur imposé, il est déduit du début du fichier (virgule ou
+    point-virgule, fréquent dans les exports Excel français).
+    """
+
+    def __init__(self, path, delimiter=None):
+        self.path = path
+        self.row_count = None
+        self.line_number = 1
+        self._file = open(path, 'r', encoding=_detect_text_encoding(path), newline='')
+        try:
+            if delimiter is None:
+                sample = self._file.read(65536)
+                self._file.seek(0)
+                try:
+                    delimiter = csv.Sniffer().sniff(sample, delimiters=',;\t').delimiter
+                except csv.Error:
+                    delimiter = ','
+            self._rows = csv.reader(self._file, delimiter=delimiter)
+            self.headers = map_headers(next(self._rows, None) or ())
+        except Exception:
+            self._file.close()
+            raise
+
+    def __iter__(self):
+        headers = self.headers
+        rows = self._rows
+        # Une fiche peut s'étendre sur plusieurs lignes (champ entre guillemets) : sa première ligne
+        next_line = rows.line_num + 1
+        for values in rows:
+            self.line_number = next_line
+            next_line = rows.line_num + 1
+            yield row_to_contact(values, headers)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonLinesContactSource:
+    """
+    Source de fiches contact lue en flux depuis un fichier JSON Lines (un objet par ligne).
+
+    Les clés des objets sont associées aux champs sans tenir compte de la
+    casse ; les en-têtes sont les clés du premier objet. Les lignes vides
+    sont ignorées.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.row_count = None
+        self.line_number = 0
+        self._file = open(path, 'r', encoding='utf-8-sig')
+        self._first = None
+        self._first_line = 0
+        self.headers = {}
+        try:
+            for self._first_line, line in enumerate(self._file, start=1):
+                if line.strip():
+                    self._first = self._parse(line)
+                    break
+        except Exception:
+            self._file.close()
+            raise
+        if self._first is not None:
+            self.headers = {key: col_idx for col_idx, key in enumerate(self._first)}
+
+    @staticmethod
+    def _parse(line):
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError(f"Ligne JSON invalide (objet attendu): {line.strip()[:80]}")
+        return {str(key).strip().lower(): value for key, value in record.items()}
+
+    def __iter__(self):
+        if self._first is None:
+            return
+        record = self._first
+        self._first = None
+        self.line_number = self._first_line
+        yield {field: cell_text(record.get(field)) for field in CONTACT_FIELDS}
+        for self.line_number, line in enumerate(self._file, start=self._first_line + 1):
+            if not line.strip():
+                continue
+            record = self._parse(line)
+            yield {field: cell_text(record.get(field)) for field in CONTACT_FIELDS}
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Extensions reconnues et source correspondante
+SOURCE_EXTENSIONS = {
+    '.xlsx': ExcelContactSource,
+    '.xlsm': ExcelContactSource,
+    '.csv': CsvContactSource,
+    '.tsv': lambda path: CsvContactSource(path, delimiter='\t'),
+    '.tab': lambda path: CsvContactSource(path, delimiter='\t'),
+    '.jsonl': JsonLinesContactSource,
+    '.ndjson': JsonLinesContactSource,
+}
+
+# Filtres de fichiers pour les boîtes de dialogue
+SOURCE_FILETYPES = [
+    ("Fichiers de contacts", "*.xlsx;*.xlsm;*.csv;*.tsv;*.tab;*.jsonl;*.ndjson"),
+    ("Fichiers Excel", "*.xlsx;*.xlsm"),
+    ("Fichiers CSV / TSV", "*.csv;*.tsv;*.tab"),
+    ("Fichiers JSON Lines", "*.jsonl;*.ndjson"),
+]
+
+
+def open_contact_source(path):
+    """
+    Ouvre la source de fiches contact adaptée à l'extension du fichier (Excel par défaut)
+    """
+    extension = os.path.splitext(str(path))[1].lower()
+    source_class = SOURCE_EXTENSIONS.get(extension, ExcelContactSource)
+    return source_class(path)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sprite SVG : tous les QR codes d'un lot dans un seul document.
+
+Chaque QR code est un <symbol> dont l'identifiant est dérivé du nom de
+fichier qu'il aurait eu en sortie séparée ; une page web l'affiche avec
+<svg><use href="qr_codes.svg#qr-Jean_DUPONT_1"/></svg>. Les trois motifs
+de repérage, identiques d'un QR code à l'autre, sont définis une seule
+fois et réutilisés ; les modules sont tracés en unités de module, une
+commande par suite horizontale de modules noirs. Aucun style n'est répété
+par symbole : le remplissage (noir par défaut) est hérité de l'élément
+<use>, la page peut donc changer la couleur.
+
+Un index JSON (nom de fichier -> identifiant et nom du contact) est écrit
+à côté du sprite. Les deux fichiers sont écrits au fil de l'eau.
+"""
+import json
+from pathlib import Path
+
+from qr_output import OutputSink
+
+# Préfixe des identifiants de symbole (un identifiant XML ne commence pas par un chiffre)
+SYMBOL_ID_PREFIX = "qr-"
+
+# Identifiant du motif de repérage partagé
+FINDER_ID = "qr-finder"
+
+# Côté d'un motif de repérage, en modules
+FINDER_SIZE = 7
+
+
+def symbol_id(name):
+    """
+    Identifiant de symbole stable pour un nom de fichier
+    """
+    return SYMBOL_ID_PREFIX + "".join(c if c.isalnum() or c in ('-', '_') else '_' for c in name)
+
+
+def modules_to_symbol_path(modules, border):
+    """
+    Tracé SVG des modules noirs hors motifs de repérage, en unités de module
+    (bordure comprise) : un rectangle par suite horizontale de modules noirs,
+    positionné relativement au précédent
+    """
+    modules_count = len(modules)
+    far = modules_count - FINDER_SIZE
+    parts = []
+    # Déplacements relatifs au début du rectangle précédent (où « z » ramène le point courant)
+    x0 = y0 = None
+    for r, row in enumerate(modules):
+        # Colonnes occupées par les motifs de repérage sur cette ligne
+        if r < FINDER_SIZE:
+            first, last = FINDER_SIZE, far
+        elif r >= far:
+            first, last = FINDER_SIZE, modules_count
+        else:
+            first, last = 0, modules_count
+        y = r + border
+        c = first
+        while c < last:
+            if row[c]:
+                start = c
+                while c < last and row[c]:
+                    c += 1
+                x = start + border
+                if x0 is None:
+                    parts.append(f"M{x} {y}h{c - start}v1h-{c - start}z")
+                else:
+                    parts.append(f"m{x - x0} {y - y0}h{c - start}v1h-{c - start}z")
+                x0, y0 = x, y
+            else:
+                c += 1
+    return "".join(parts)
+
+
+class SvgSpriteWriter(OutputSink):
+    """
+    Sprite SVG alimenté QR code par QR code, et son index JSON.
+
+    index_path : chemin de l'index (par défaut, celui du sprite avec l'extension .json)
+    border : bordure (en modules) incluse dans la viewBox de chaque symbole
+    """
+
+    wants_modules = True
+
+    def __init__(self, path, index_path=None, border=2):
+        self.path = Path(path)
+        self.index_path = Path(index_path) if index_path is not None else self.path.with_suffix('.json')
+        self.border = border
+        self.count = 0
+
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self.index_path.parent.mkdir(exist_ok=True, parents=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._index = open(self.index_path, 'w', encoding='utf-8')
+
+        # Motif de repérage : carré 7x7, anneau blanc, carré central 3x3
+        self._file.write(
+            "<?xml version='1.0' encoding='UTF-8'?>\n"
+            '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">\n'
+            f'<defs><path id="{FINDER_ID}" fill-rule="evenodd" '
+            'd="M0 0h7v7h-7zM1 1v5h5v-5zM2 2h3v3h-3z"/></defs>\n'
+        )
+        self._index.write("{")
+
+    def add(self, name, modules, caption=''):
+        """
+        Ajoute le QR code `name` (nom de fichier sans extension) et sa légende
+        """
+        border = self.border
+        modules_count = len(modules)
+        far = modules_count - FINDER_SIZE + border
+        side = modules_count + 2 * border
+        identifier = symbol_id(name)
+
+        self._file.write(
+            f'<symbol id="{identifier}" viewBox="0 0 {side} {side}">'
+            f'<use xlink:href="#{FINDER_ID}" x="{border}" y="{border}"/>'
+            f'<use xlink:href="#{FINDER_ID}" x="{far}" y="{border}"/>'
+            f'<use xlink:href="#{FINDER_ID}" x="{border}" y="{far}"/>'
+            f'<path d="{modules_to_symbol_path(modules, border)}"/></symbol>\n'
+        )
+
+        separator = "," if self.count else ""
+        entry = json.dumps({'id': identifier, 'name': caption}, ensure_ascii=False)
+        self._index.write(f"{separator}\n  {json.dumps(name, ensure_ascii=False)}: {entry}")
+        self.count += 1
+
+    def describe(self):
+        """
+        Résumé du document produit
+        """
+        return f"{self.count} QR code(s) écrit(s) dans le sprite: {self.path} (index: {self.index_path})"
+
+    def discard(self):
+        """
+        Abandonne le document : ferme et supprime le sprite et son index
+        """
+        self._file.close()
+        self._index.close()
+        self.path.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
+
+    def close(self):
+        """
+        Termine le sprite et l'index
+        """
+        if self._file.closed:
+            return
+        self._file.write("</svg>\n")
+        self._file.close()
+        self._index.write("\n}\n")
+        self._index.close()
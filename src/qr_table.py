@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tableau virtualisé pour afficher de très gros fichiers de contacts.
+
+Seules les lignes visibles (plus une ligne de marge) existent comme éléments
+du Treeview ; la barre de défilement, la molette et le clavier déplacent une
+fenêtre sur les index des données. Le temps d'affichage et la mémoire de Tk
+ne dépendent donc plus du nombre de lignes du fichier.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+# Hauteur de ligne utilisée tant que le tableau n'a pas encore été affiché
+DEFAULT_ROW_HEIGHT = 20
+
+# Lignes supplémentaires gardées sous la partie visible
+WINDOW_MARGIN = 1
+
+
+class VirtualTable:
+    """
+    Treeview virtualisé.
+
+    columns : liste (identifiant, titre, largeur) des colonnes
+    row_values : fonction index -> valeurs de la ligne à afficher
+    on_select : fonction appelée avec l'index de la ligne choisie par l'utilisateur
+    Les éléments du Treeview ont pour identifiant l'index de la ligne dans les données.
+    """
+
+    def __init__(self, parent, columns, row_values, on_select=None):
+        self.row_values = row_values
+        self.on_select = on_select
+        self.row_count = 0
+        self.first = 0
+        self.visible_rows = 20
+        self.selected_index = None
+        self._notified_index = None
+        self._row_height = None
+        self._header_height = 0
+        # Fraction de ligne de molette pas encore défilée (pavés tactiles de précision)
+        self._wheel_remainder = 0.0
+
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=[col_id for col_id, _, _ in columns],
+                                 show="headings", selectmode="browse")
+        for col_id, title, width in columns:
+            self.tree.heading(col_id, text=title)
+            self.tree.column(col_id, width=width)
+
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.yview)
+        # Molette : un cran vaut 120 sous Windows (les pavés tactiles envoient des fractions
+        # de cran), une ligne sous macOS
+        self._wheel_unit = 1 if self.tree.tk.call('tk', 'windowingsystem') == 'aqua' else 120
+
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Défilement géré par la fenêtre virtuelle et non par le Treeview
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda event: self._scroll_by(3))
+        self.tree.bind("<Up>", lambda event: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self._move_selection(-self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self._move_selection(self.visible_rows))
+        self.tree.bind("<Home>", lambda event: self._move_selection(-self.row_count))
+        self.tree.bind("<End>", lambda event: self._move_selection(self.row_count))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def index_of(self, item):
+        """
+        Index dans les données d'un élément du Treeview
+        """
+        return int(item)
+
+    def set_row_count(self, row_count):
+        """
+        Indique le nombre de lignes des données (la position affichée est conservée)
+        """
+        self.row_count = row_count
+        if self.selected_index is not None and self.selected_index >= row_count:
+            self.selected_index = None
+        self._refresh()
+
+    def clear(self):
+        """
+        Vide le tableau
+        """
+        self.first = 0
+        self.selected_index = None
+        self._notified_index = None
+        self.set_row_count(0)
+
+    def refresh(self):
+        """
+        Réaffiche les lignes visibles (après une modification des données)
+        """
+        self._refresh()
+
+    def yview(self, *args):
+        """
+        Commande de la barre de défilement ("moveto" ou "scroll")
+        """
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * self.row_count))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible_rows
+            self._scroll_by(amount)
+
+    def see(self, index):
+        """
+        Fait défiler le tableau pour que la ligne soit visible
+        """
+        if index < self.first:
+            self._scroll_to(index)
+        elif index >= self.first + self.visible_rows:
+            self._scroll_to(index - self.visible_rows + 1)
+
+    def select(self, index):
+        """
+        Sélectionne une ligne (et la rend visible)
+        """
+        self.selected_index = index
+        self.see(index)
+        self._refresh()
+
+    def deselect(self):
+        """
+        Retire la sélection
+        """
+        self.selected_index = None
+        self._notified_index = None
+        self.tree.selection_set(())
+
+    def _max_first(self):
+        return max(0, self.row_count - self.visible_rows)
+
+    def _scroll_to(self, first):
+        first = min(max(0, first), self._max_first())
+        if first != self.first:
+            self.first = first
+            self._refresh()
+
+    def _scroll_by(self, amount):
+        self._scroll_to(self.first + amount)
+        return "break"
+
+    def _on_mousewheel(self, event):
+        # Trois lignes par cran ; les fractions s'accumulent jusqu'à une ligne entière
+        self._wheel_remainder -= 3 * event.delta / self._wheel_unit
+        lines = int(self._wheel_remainder)
+        self._wheel_remainder -= lines
+        if not lines:
+            return "break"
+        return self._scroll_by(lines)
+
+    def _move_selection(self, amount):
+        if not self.row_count:
+            return "break"
+        current = self.selected_index if self.selected_index is not None else self.first - (1 if amount > 0 else 0)
+        index = min(max(0, current + amount), self.row_count - 1)
+        self.select(index)
+        return "break"
+
+    def _on_select(self, event):
+        selected = self.tree.selection()
+        if not selected:
+            # La ligne sélectionnée est simplement sortie de la fenêtre affichée
+            return
+        self.selected_index = self.index_of(selected[0])
+
+        # La sélection est restaurée à chaque défilement : ne prévenir qu'en cas de changement
+        if self.selected_index != self._notified_index:
+            self._notified_index = self.selected_index
+            if self.on_select is not None:
+                self.on_select(self.selected_index)
+
+    def _measure_rows(self):
+        """
+        Mesure la hauteur des lignes et de l'en-tête sur une ligne affichée
+        """
+        children = self.tree.get_children()
+        if self._row_height is None and children:
+            bbox = self.tree.bbox(children[0])
+            if bbox:
+                self._header_height = bbox[1]
+                self._row_height = bbox[3]
+
+    def _on_configure(self, event):
+        self._measure_rows()
+        row_height = self._row_height or DEFAULT_ROW_HEIGHT
+        visible_rows = max(1, (event.height - self._header_height) // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.first = min(self.first, self._max_first())
+            self._refresh()
+
+    def _refresh(self):
+        """
+        Remplace les éléments du Treeview par la fenêtre de lignes courante
+        """
+        self.first = min(self.first, self._max_first())
+        last = min(self.row_count, self.first + self.visible_rows + WINDOW_MARGIN)
+
+        tree = self.tree
+        children = tree.get_children()
+        if children:
+            tree.delete(*children)
+        for index in range(self.first, last):
+            tree.insert('', tk.END, iid=str(index), values=self.row_values(index))
+
+        # Restaurer la sélection si la ligne sélectionnée est dans la fenêtre
+        if self.selected_index is not None and self.first <= self.selected_index < last:
+            tree.selection_set(str(self.selected_index))
+            tree.focus(str(self.selected_index))
+        tree.yview_moveto(0)
+
+        if self._row_height is None:
+            self._measure_rows()
+
+        if self.row_count:
+            self.scrollbar.set(self.first / self.row_count,
+                               min(1.0, (self.first + self.visible_rows) / self.row_count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chronométrage par étape des générations en lot.
+
+Chaque ligne traitée accumule le temps passé dans les étapes de la chaîne
+(lecture du fichier, construction de la vCard, consultation du cache,
+encodage du QR code, rendu SVG, écriture). En fin d'exécution, le résumé
+donne les totaux, les percentiles par ligne et les lignes les plus lentes,
+en texte ou en JSON.
+"""
+import json
+import time
+from array import array
+
+# Étapes mesurées, dans l'ordre de la chaîne
+STAGES = ('parse', 'vcard', 'cache', 'encode', 'render', 'write')
+
+# Libellés des étapes pour le résumé texte
+STAGE_LABELS = {
+    'parse': "Lecture du fichier",
+    'vcard': "Construction vCard",
+    'cache': "Cache de rendu",
+    'encode': "Encodage QR",
+    'render': "Rendu SVG",
+    'write': "Écriture",
+}
+
+
+def _percentile(ordered, fraction):
+    """
+    Percentile (plus proche rang) d'une liste triée
+    """
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class StageTimer:
+    """
+    Accumulateur des durées par étape et par ligne.
+
+    Les durées sont stockées dans des tableaux compacts (une valeur par ligne
+    et par étape) pour rester légères sur de très gros lots.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.totals = dict.fromkeys(STAGES, 0.0)
+        self.row_names = []
+        self._row_index = {}
+        self._row_stages = {stage: array('d') for stage in STAGES}
+
+    def _index(self, row):
+        index = self._row_index.get(row)
+        if index is None:
+            index = len(self.row_names)
+            self._row_index[row] = index
+            self.row_names.append(row)
+            for values in self._row_stages.values():
+                values.append(0.0)
+        return index
+
+    def add(self, stage, seconds, row=None):
+        """
+        Ajoute une durée à une étape, et à la ligne indiquée le cas échéant
+        """
+        self.totals[stage] += seconds
+        if row is not None:
+            self._row_stages[stage][self._index(row)] += seconds
+
+    def add_many(self, timings, row=None):
+        """
+        Ajoute un dictionnaire étape -> durée (tel que rempli par render_qr_svg)
+        """
+        for stage, seconds in timings.items():
+            self.add(stage, seconds, row)
+
+    def stop(self):
+        """
+        Fige la durée totale de l'exécution
+        """
+        self.elapsed = time.perf_counter() - self.started
+
+    def summary(self, slowest=10):
+        """
+        Résumé de l'exécution sous forme de dictionnaire (sérialisable en JSON).
+        Les durées sont en millisecondes.
+        """
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        row_count = len(self.row_names)
+
+        stages = {}
+        for stage in STAGES:
+            ordered = sorted(self._row_stages[stage])
+            stages[stage] = {
+                'total_ms': round(self.totals[stage] * 1000, 3),
+                'p50_ms': round(_percentile(ordered, 0.50) * 1000, 4),
+                'p90_ms': round(_percentile(ordered, 0.90) * 1000, 4),
+                'p99_ms': round(_percentile(ordered, 0.99) * 1000, 4),
+                'max_ms': round((ordered[-1] if ordered else 0.0) * 1000, 4),
+            }
+
+        row_totals = [sum(self._row_stages[stage][i] for stage in STAGES) for i in range(row_count)]
+        ordered_totals = sorted(row_totals)
+        slowest_rows = sorted(range(row_count), key=row_totals.__getitem__, reverse=True)[:slowest]
+
+        return {
+            'elapsed_ms': round(elapsed * 1000, 3),
+            'rows': row_count,
+            'rows_per_s': round(row_count / elapsed, 2) if elapsed > 0 else None,
+            'stages': stages,
+            'row_total': {
+                'p50_ms': round(_percentile(ordered_totals, 0.50) * 1000, 4),
+                'p90_ms': round(_percentile(ordered_totals, 0.90) * 1000, 4),
+                'p99_ms': round(_percentile(ordered_totals, 0.99) * 1000, 4),
+            },
+            'slowest_rows': [
+                {
+                    'row': self.row_names[i],
+                    'total_ms': round(row_totals[i] * 1000, 4),
+                    'stages_ms': {stage: round(self._row_stages[stage][i] * 1000, 4) for stage in STAGES},
+                }
+                for i in slowest_rows
+            ],
+        }
+
+    def to_json(self, slowest=10):
+        """
+        Résumé au format JSON
+        """
+        return json.dumps(self.summary(slowest), ensure_ascii=False, indent=2)
+
+    def format_text(self, slowest=5):
+        """
+        Résumé lisible de l'exécution
+        """
+        summary = self.summary(slowest)
+        lines = [
+            f"Durée totale: {summary['elapsed_ms'] / 1000:.2f} s "
+            f"pour {summary['rows']} ligne(s) ({summary['rows_per_s'] or 0:.1f} lignes/s)",
+            f"{'Étape':<20} {'Total (s)':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10}",
+        ]
+        for stage in STAGES:
+            stats = summary['stages'][stage]
+            lines.append(
+                f"{STAGE_LABELS[stage]:<20} {stats['total_ms'] / 1000:>10.3f} "
+                f"{stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f} {stats['max_ms']:>10.3f}"
+            )
+        row_total = summary['row_total']
+        lines.append(
+            f"Par ligne: p50 {row_total['p50_ms']:.3f} ms, p90 {row_total['p90_ms']:.3f} ms, "
+            f"p99 {row_total['p99_ms']:.3f} ms"
+        )
+        if summary['slowest_rows']:
+            lines.append("Lignes les plus lentes:")
+            for row in summary['slowest_rows']:
+                lines.append(f"  {row['row']}: {row['total_ms']:.3f} ms")
+        return "\n".join(lines)
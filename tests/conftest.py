@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+Configuration pytest : les modules de l'application sont importés depuis src/
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
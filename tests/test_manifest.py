@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la régénération incrémentale (qr_manifest) à travers process_records
+"""
+import os
+
+from qr_manifest import OutputManifest
+from qr_output import DirectorySink
+from qr_generator import process_records
+from qr_sources import RECORD_NUMBER_FIELD
+
+JEAN = {'prenom': "Jean", 'nom': "DUPONT", 'email': "jean@a.fr"}
+ANNE = {'prenom': "Anne", 'nom': "MARTIN"}
+PAUL = {'prenom': "Paul", 'nom': "DURAND"}
+
+
+def run(output_dir, records, source_name="a.csv"):
+    return process_records(records, workers=1, incremental=True, verbose=False,
+                           sink=DirectorySink(output_dir), source_name=source_name)
+
+
+def svg_files(output_dir):
+    return sorted(path.name for path in output_dir.glob("*.svg"))
+
+
+def test_unchanged_rows_are_not_rewritten(tmp_path):
+    assert run(tmp_path, [JEAN, ANNE])
+    old = 1_000_000_000
+    for path in tmp_path.glob("*.svg"):
+        os.utime(path, ns=(old, old))
+
+    assert run(tmp_path, [JEAN, {**ANNE, 'email': "anne@a.fr"}])
+    assert (tmp_path / "Jean_DUPONT_1.svg").stat().st_mtime_ns == old
+    assert (tmp_path / "Anne_MARTIN_2.svg").stat().st_mtime_ns != old
+
+
+def test_stale_files_are_removed(tmp_path):
+    assert run(tmp_path, [JEAN, ANNE, PAUL])
+    assert run(tmp_path, [JEAN, ANNE])
+    assert svg_files(tmp_path) == ["Anne_MARTIN_2.svg", "Jean_DUPONT_1.svg"]
+
+
+def test_sources_sharing_a_folder_keep_their_own_files(tmp_path):
+    jean_b = {**JEAN, 'email': "jean@b.fr"}
+    assert run(tmp_path, [JEAN, ANNE], source_name="a.csv")
+    content_a = (tmp_path / "Jean_DUPONT_1.svg").read_bytes()
+
+    # Même nom et même numéro de ligne dans b.csv : nom propre à la source b
+    assert run(tmp_path, [jean_b], source_name="b.csv")
+    tag_b = OutputManifest(tmp_path, source="b.csv").tag
+    file_b = tmp_path / f"Jean_DUPONT_1-{tag_b}.svg"
+    assert (tmp_path / "Jean_DUPONT_1.svg").read_bytes() == content_a
+    content_b = file_b.read_bytes()
+    assert content_b != content_a
+
+    # Relancer a, puis retirer ses lignes, ne touche pas aux fichiers de b
+    assert run(tmp_path, [JEAN, ANNE], source_name="a.csv")
+    assert run(tmp_path, [PAUL], source_name="a.csv")
+    assert svg_files(tmp_path) == [file_b.name, "Paul_DURAND_1.svg"]
+    assert file_b.read_bytes() == content_b
+
+    # Chaque source retrouve ses lignes inchangées
+    manifest = OutputManifest(tmp_path, source="b.csv")
+    assert list(manifest.previous) == [file_b.stem]
+    assert list(manifest.others) == ["a.csv"]
+
+
+def test_full_run_does_not_overwrite_other_source_files(tmp_path):
+    assert run(tmp_path, [JEAN], source_name="a.csv")
+    content_a = (tmp_path / "Jean_DUPONT_1.svg").read_bytes()
+
+    # Sans mode incrémental, le manifeste sert encore à reconnaître les fichiers de a
+    assert process_records([{**JEAN, 'email': "jean@b.fr"}], workers=1, verbose=False,
+                           sink=DirectorySink(tmp_path), source_name="b.csv")
+    tag_b = OutputManifest(tmp_path, source="b.csv").tag
+    assert (tmp_path / "Jean_DUPONT_1.svg").read_bytes() == content_a
+    assert (tmp_path / f"Jean_DUPONT_1-{tag_b}.svg").is_file()
+
+
+def test_filtered_records_keep_their_file_numbers(tmp_path):
+    # Fiches lues avec une ligne vide (numérotation de la ligne de commande)
+    assert run(tmp_path, [JEAN, {}, ANNE])
+    old = 1_000_000_000
+    for path in tmp_path.glob("*.svg"):
+        os.utime(path, ns=(old, old))
+
+    # Mêmes fiches sans la ligne vide, comme dans le tableau de l'interface
+    assert run(tmp_path, [{**JEAN, RECORD_NUMBER_FIELD: 1}, {**ANNE, RECORD_NUMBER_FIELD: 3}])
+    assert svg_files(tmp_path) == ["Anne_MARTIN_3.svg", "Jean_DUPONT_1.svg"]
+    assert all(path.stat().st_mtime_ns == old for path in tmp_path.glob("*.svg"))
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des planches d'étiquettes PDF (qr_pdf)
+"""
+import re
+import zlib
+
+import pytest
+
+from qr_pdf import PdfLabelWriter, SheetLayout, DEFAULT_SHEET_LAYOUT, MIN_QR_SIDE, MM, sheet_qr_side
+from qr_render import encode_modules
+from qr_generator import run_cli
+
+
+@pytest.mark.parametrize("layout", [
+    SheetLayout(2, 70, 'a4', 10, True),
+    SheetLayout(3, 7, 'a4', 200, True),
+    SheetLayout(40, 1, 'letter', 10, False),
+])
+def test_too_dense_layout_is_rejected(tmp_path, layout):
+    with pytest.raises(ValueError):
+        PdfLabelWriter(tmp_path / "planches.pdf", layout)
+    assert not (tmp_path / "planches.pdf").exists()
+
+
+def test_default_layout_draws_upright_codes(tmp_path):
+    assert sheet_qr_side(DEFAULT_SHEET_LAYOUT) >= MIN_QR_SIDE * MM
+    with PdfLabelWriter(tmp_path / "planches.pdf") as writer:
+        writer.add("Jean_DUPONT_1", encode_modules("BEGIN:VCARD", 1, 1), "Jean DUPONT")
+    content = (tmp_path / "planches.pdf").read_bytes()
+    stream = re.search(rb"stream\n(.*?)endstream", content, re.S).group(1)
+    scale = float(zlib.decompress(stream).split()[1])
+    assert scale > 0
+
+
+def test_cli_reports_too_dense_grid(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        run_cli([str(tmp_path / "contacts.csv"), "-o", str(tmp_path), "--sheets", "--grid", "2x70"])
+    assert exit_info.value.code == 2
+    assert "2x70" in capsys.readouterr().err
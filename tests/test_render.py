@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du rendu direct (qr_render) et de la sélection du masque (qr_mask),
+comparés à la bibliothèque qrcode de référence
+"""
+import io
+import random
+
+import pytest
+import qrcode
+import qrcode.util
+import qrcode.image.svg
+from qrcode.constants import ERROR_CORRECT_L, ERROR_CORRECT_H
+
+from qr_mask import FastMaskQRCode, best_mask_pattern
+from qr_render import encode_modules, modules_to_svg
+from qr_generator import create_vcard, render_qr_svg, QR_BOX_SIZE, QR_BORDER
+
+ERROR_CORRECTIONS = {'L': ERROR_CORRECT_L, 'H': ERROR_CORRECT_H}
+VERSIONS = range(1, 41)
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEF0123456789 ;:.@éè"
+
+
+def filling_data(version, error_correction):
+    """
+    Texte (octets) occupant presque toute la capacité d'une version, déterministe
+    """
+    # Mode octet : 4 bits de mode et jusqu'à 16 bits de longueur ; « é » compte pour 2 octets
+    capacity = (qrcode.util.BIT_LIMIT_TABLE[error_correction][version] - 20) // 8
+    rng = random.Random(version * 10 + error_correction)
+    data = ""
+    while len((data + "é").encode('utf-8')) <= capacity:
+        data += rng.choice(ALPHABET)
+    return data
+
+
+@pytest.mark.parametrize("level", ERROR_CORRECTIONS)
+@pytest.mark.parametrize("version", VERSIONS)
+def test_svg_matches_svg_path_image(version, level):
+    error_correction = ERROR_CORRECTIONS[level]
+    qr = qrcode.QRCode(version=version, error_correction=error_correction,
+                       box_size=QR_BOX_SIZE, border=QR_BORDER)
+    qr.add_data(filling_data(version, error_correction))
+    qr.make(fit=False)
+
+    buffer = io.BytesIO()
+    qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    assert modules_to_svg(qr.modules, QR_BOX_SIZE, QR_BORDER) == buffer.getvalue()
+
+
+@pytest.mark.parametrize("level", ERROR_CORRECTIONS)
+@pytest.mark.parametrize("version", VERSIONS)
+def test_mask_matches_best_mask_pattern(version, level):
+    error_correction = ERROR_CORRECTIONS[level]
+    data = filling_data(version, error_correction)
+
+    reference = qrcode.QRCode(version=version, error_correction=error_correction)
+    reference.add_data(data)
+    fast = FastMaskQRCode(version=version, error_correction=error_correction)
+    fast.add_data(data)
+
+    assert best_mask_pattern(fast) == qrcode.QRCode.best_mask_pattern(reference)
+
+
+@pytest.mark.parametrize("level", ERROR_CORRECTIONS)
+def test_encode_modules_matches_qrcode(level):
+    error_correction = ERROR_CORRECTIONS[level]
+    for length in (1, 20, 150, 600):
+        data = filling_data(40, error_correction)[:length]
+        reference = qrcode.QRCode(version=1, error_correction=error_correction, border=0)
+        reference.add_data(data)
+        reference.make(fit=True)
+        assert encode_modules(data, 1, error_correction) == reference.modules
+
+
+def test_direct_renderer_matches_qrcode_renderer():
+    vcard = create_vcard("Élodie", "LEFÈVRE", "Chef de projet", "SUDALYS SERVICES",
+                         "06.12.34.56.78", "01.23.45.67.89", "elodie.lefevre@sudalys.fr",
+                         "12 rue de Paris 75001 PARIS", "https://www.sudalys.fr")
+    assert render_qr_svg(vcard, renderer="direct") == render_qr_svg(vcard, renderer="qrcode")
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des sources de fiches contact (CSV, TSV, JSON Lines)
+"""
+from qr_sources import open_contact_source, _detect_text_encoding
+
+HEADER = "prenom;nom;email\n"
+
+
+def read_all(path):
+    with open_contact_source(path) as source:
+        return list(source)
+
+
+def test_csv_utf8(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text(HEADER + "Élodie;LEFÈVRE;elodie@example.fr\n", encoding='utf-8')
+    assert _detect_text_encoding(path) == 'utf-8-sig'
+    contacts = read_all(path)
+    assert contacts[0]['prenom'] == "Élodie"
+    assert contacts[0]['nom'] == "LEFÈVRE"
+
+
+def test_csv_utf8_bom(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text(HEADER + "Chloé;GARÇON;\n", encoding='utf-8-sig')
+    assert read_all(path)[0]['prenom'] == "Chloé"
+
+
+def test_csv_cp1252(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text(HEADER + "Hélène;FAURE;\n", encoding='cp1252')
+    assert _detect_text_encoding(path) == 'cp1252'
+    assert read_all(path)[0]['prenom'] == "Hélène"
+
+
+def test_csv_cp1252_first_accent_after_sample(tmp_path):
+    # Premier caractère accentué bien après les 64 premiers Ko
+    lines = [f"Jean;DUPONT{i};jean{i}@example.fr\n" for i in range(5000)]
+    path = tmp_path / "contacts.csv"
+    path.write_text(HEADER + "".join(lines) + "Noël;MERCIER;\n", encoding='cp1252')
+    assert path.stat().st_size > 2 * 65536
+    assert _detect_text_encoding(path) == 'cp1252'
+    contacts = read_all(path)
+    assert len(contacts) == 5001
+    assert contacts[-1]['prenom'] == "Noël"
+
+
+def test_csv_utf8_character_across_chunks(tmp_path):
+    # Caractère multi-octets coupé entre deux blocs de lecture : reste de l'UTF-8
+    path = tmp_path / "contacts.csv"
+    data = (HEADER + "x" * 1000 + "é;A;\n").encode('utf-8')
+    cut = data.index("é".encode('utf-8')) + 1
+    path.write_bytes(data)
+    assert _detect_text_encoding(path, chunk_size=cut) == 'utf-8-sig'
+
+
+def test_tsv(tmp_path):
+    path = tmp_path / "contacts.tsv"
+    path.write_text("prenom\tnom\nLoïc\tMOREAU\n", encoding='utf-8')
+    assert read_all(path)[0]['nom'] == "MOREAU"
+
+
+def test_jsonl(tmp_path):
+    path = tmp_path / "contacts.jsonl"
+    path.write_text('{"Prenom": "Amélie", "Nom": "GIRARD"}\n\n{"prenom": "Pierre", "nom": 12}\n',
+                    encoding='utf-8')
+    contacts = read_all(path)
+    assert [c['prenom'] for c in contacts] == ["Amélie", "Pierre"]
+    assert contacts[1]['nom'] == "12"
+
+
+def test_csv_line_number_with_multiline_field(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text('prenom;nom;adresse\nJean;DUPONT;"1 rue\nde Paris"\n;;\n', encoding='utf-8')
+    with open_contact_source(path) as source:
+        lines = [source.line_number for _ in source]
+    assert lines == [2, 4]
+
+
+def test_jsonl_line_number_skips_blank_lines(tmp_path):
+    path = tmp_path / "contacts.jsonl"
+    path.write_text('\n{"prenom": "A", "nom": "B"}\n\n{"prenom": "", "nom": ""}\n', encoding='utf-8')
+    with open_contact_source(path) as source:
+        lines = [source.line_number for _ in source]
+    assert lines == [2, 4]